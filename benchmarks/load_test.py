@@ -0,0 +1,153 @@
+# Нагрузочный тест HTTP-сервиса: запросы/с и задержки (p50, p90, p99).
+#
+#   python -m channel_sim.service --port 8765 &
+#   python benchmarks/load_test.py --concurrency 32 --requests 2000
+#   python benchmarks/load_test.py --spawn-server --path /pmf --n 100000 --distinct 4
+#
+# Каждый клиент держит своё соединение keep-alive и отправляет запросы
+# подряд. --distinct задаёт число разных p в запросах: при 1 все запросы
+# делят одни и те же теоретические таблицы.
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+async def request(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                  "Content-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("ascii") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, path, payloads, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while payloads:
+            payload = payloads.pop()
+            start = time.perf_counter()
+            status = await request(reader, writer, host, path, payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(values, q):
+    index = min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))
+    return values[index]
+
+
+async def run_load(host, port, path, payloads, concurrency):
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, path, payloads, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "latency_ms": {
+            "mean": 1000 * sum(latencies) / len(latencies),
+            "p50": 1000 * percentile(latencies, 50),
+            "p90": 1000 * percentile(latencies, 90),
+            "p99": 1000 * percentile(latencies, 99),
+            "max": 1000 * latencies[-1],
+        },
+    }
+
+
+async def wait_for_server(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def build_payloads(args):
+    payloads = []
+    for i in range(args.requests):
+        payload = {"n": args.n, "p": round(args.p + (i % args.distinct) * 1e-3, 6)}
+        if args.path != "/pmf":
+            payload["experiments"] = args.experiments
+            payload["seed"] = i
+        payloads.append(payload)
+    payloads.reverse()
+    return payloads
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест channel_sim.service")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--path", default="/simulate", choices=("/simulate", "/pmf"))
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--n", type=int, default=100)
+    parser.add_argument("--p", type=float, default=0.3)
+    parser.add_argument("--experiments", type=int, default=10000)
+    parser.add_argument("--distinct", type=int, default=1, help="число разных значений p")
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="запустить сервис на время теста (python -m channel_sim.service)")
+    parser.add_argument("--workers", type=int, default=0, help="процессы запускаемого сервиса")
+    parser.add_argument("-o", "--output", default=None, help="записать результат в JSON")
+    args = parser.parse_args(argv)
+    if args.requests <= 0 or args.concurrency <= 0 or args.distinct <= 0:
+        parser.error("--requests, --concurrency и --distinct должны быть > 0")
+
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    server = None
+    if args.spawn_server:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        server = subprocess.Popen([sys.executable, "-m", "channel_sim.service", "--host", host,
+                                   "--port", str(port), "--workers", str(args.workers)], cwd=root)
+    try:
+        asyncio.run(wait_for_server(host, port))
+        report = asyncio.run(run_load(host, port, args.path, build_payloads(args), args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"{report['requests']} запросов {report['path']} за {report['seconds']:.2f} с: "
+          f"{report['requests_per_second']:.1f} запросов/с, ошибок {report['errors']}")
+    latency = report["latency_ms"]
+    print(f"задержка, мс: среднее {latency['mean']:.1f}, p50 {latency['p50']:.1f}, "
+          f"p90 {latency['p90']:.1f}, p99 {latency['p99']:.1f}, max {latency['max']:.1f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(report, stream, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
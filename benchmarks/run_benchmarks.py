@@ -0,0 +1,233 @@
+# Замеры времени и пиковой памяти основных этапов расчёта.
+#
+#   python benchmarks/run_benchmarks.py -o results.json
+#   python benchmarks/run_benchmarks.py --full -o results.json
+#   python benchmarks/run_benchmarks.py --compare old.json new.json
+#
+# Время — лучшее из нескольких повторов без tracemalloc, пиковая память —
+# отдельный прогон под tracemalloc (NumPy регистрирует в нём свои массивы).
+# Отрисовка измеряется без окна, через backend Agg.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from channel_sim import (  # noqa: E402
+    GilbertElliottModel,
+    StatisticsAccumulator,
+    binomial_pmf,
+    cdf_plot_data,
+    divergence_from_histogram,
+    simulate_histogram,
+)
+from channel_sim.engine import BINOMIAL_CHUNK  # noqa: E402
+
+N_VALUES = (10, 100, 1000, 10 ** 4, 10 ** 5, 10 ** 6)
+EXPERIMENT_COUNTS = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8)
+P = 0.3
+
+
+def bench_simulation(n, experiments):
+    return lambda: simulate_histogram(n, P, experiments, seed=1)
+
+
+def bench_burst(n, experiments):
+    # Пакетные ошибки: средняя длина плохого участка 10 сообщений
+    model = GilbertElliottModel(n, 0.01, 0.1, 0.001, 0.3)
+
+    def run():
+        histogram = np.zeros(n + 1, dtype=np.int64)
+        for counts in model.batches(experiments, seed=1):
+            histogram += np.bincount(counts, minlength=n + 1)
+        return histogram
+    return run
+
+
+def bench_statistics(n, experiments):
+    batch = np.random.default_rng(1).binomial(n, P, size=min(experiments, BINOMIAL_CHUNK))
+
+    def run():
+        accumulator = StatisticsAccumulator(n)
+        remaining = experiments
+        while remaining > 0:
+            accumulator.add(batch[:remaining])
+            remaining -= len(batch)
+        return accumulator.statistics(P)
+    return run
+
+
+def bench_pmf(n, experiments):
+    return lambda: binomial_pmf(n, P)
+
+
+def _histogram(n):
+    return simulate_histogram(n, P, 10 ** 6, seed=1)
+
+
+def bench_divergence(n, experiments):
+    mas_ni = _histogram(n)
+    theoretical_probs = binomial_pmf(n, P)
+    return lambda: divergence_from_histogram(mas_ni, theoretical_probs)
+
+
+def bench_rendering(n, experiments):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    result = divergence_from_histogram(_histogram(n), binomial_pmf(n, P))
+
+    def run():
+        # Как в интерфейсе: обрезанные и прореженные кривые и отрезок D
+        figure = Figure(figsize=(6, 4), dpi=100)
+        canvas = FigureCanvasAgg(figure)
+        ax = figure.add_subplot(111)
+        xn = result["xn"]
+        x, theoretical, sample = cdf_plot_data(result["theoretical_cdf"], result["sample_cdf"], xn)
+        ax.step(x, theoretical, where="post")
+        ax.step(x, sample, where="post", linestyle="--")
+        ax.plot([xn, xn], [result["theoretical_cdf"][xn], result["sample_cdf"][xn]], color="red")
+        ax.grid()
+        canvas.draw()
+    return run
+
+
+# Этап: (функция подготовки, зависит ли от числа экспериментов)
+STAGES = {
+    "simulation": (bench_simulation, True),
+    "burst": (bench_burst, True),
+    "statistics": (bench_statistics, True),
+    "pmf": (bench_pmf, False),
+    "divergence": (bench_divergence, False),
+    "rendering": (bench_rendering, False),
+}
+
+
+def measure(run, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def cases(stages, n_values, experiment_counts, max_work):
+    for stage in stages:
+        _, uses_experiments = STAGES[stage]
+        for n in n_values:
+            if not uses_experiments:
+                yield stage, n, None
+                continue
+            for experiments in experiment_counts:
+                # Отбрасываем сочетания, заведомо непосильные для текущего прогона
+                if n * experiments <= max_work or experiments <= 10 ** 3:
+                    yield stage, n, experiments
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(stages, n_values, experiment_counts, max_work, repeats):
+    results = []
+    for stage, n, experiments in cases(stages, n_values, experiment_counts, max_work):
+        setup, _ = STAGES[stage]
+        seconds, peak = measure(setup(n, experiments), repeats)
+        record = {"stage": stage, "n": n, "experiments": experiments,
+                  "seconds": seconds, "peak_bytes": peak}
+        if experiments:
+            record["trials_per_second"] = experiments / seconds
+        results.append(record)
+        print(f"{stage:>11} n={n:<8} experiments={experiments or '-':<10} "
+              f"{seconds * 1000:10.2f} ms {peak / 2 ** 20:10.2f} MiB", file=sys.stderr)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as stream:
+        old = json.load(stream)
+    with open(new_path, encoding="utf-8") as stream:
+        new = json.load(stream)
+    key = lambda record: (record["stage"], record["n"], record["experiments"])
+    baseline = {key(record): record for record in old["results"]}
+    print(f"{'stage':>11} {'n':>8} {'experiments':>11} {'time':>8} {'memory':>8}")
+    for record in new["results"]:
+        before = baseline.get(key(record))
+        if before is None:
+            continue
+        time_ratio = record["seconds"] / before["seconds"]
+        memory_ratio = record["peak_bytes"] / max(before["peak_bytes"], 1)
+        print(f"{record['stage']:>11} {record['n']:>8} {str(record['experiments'] or '-'):>11} "
+              f"{time_ratio:7.2f}x {memory_ratio:7.2f}x")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Замеры производительности channel_sim")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="этапы через запятую: " + ", ".join(STAGES))
+    parser.add_argument("--full", action="store_true",
+                        help="вся матрица n до 10^6 и экспериментов до 10^8")
+    parser.add_argument("--max-work", type=float, default=1e9,
+                        help="предел n * experiments для этапов моделирования")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None, help="файл JSON с результатами")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="сравнить два файла результатов")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        print(f"Неизвестные этапы: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    max_work = float("inf") if args.full else args.max_work
+    report = run_benchmarks(stages, N_VALUES, EXPERIMENT_COUNTS, max_work, args.repeats)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(report, stream, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+from .engine import (
+    METHODS,
+    make_generator,
+    python_compatible_generator,
+    iter_count_batches,
+    simulate_counts,
+    simulate_histogram,
+)
+from .theory import (
+    mode_window,
+    binomial_pmf_window,
+    binomial_pmf,
+    binomial_cdf,
+    pmf_to_cdf,
+)
+from .accumulator import HISTOGRAM_DTYPE, MAX_EXPERIMENTS, StatisticsAccumulator
+from .divergence import (
+    sample_cdf_from_histogram,
+    max_divergence,
+    kolmogorov_pvalue,
+    divergence_from_histogram,
+)
+from .core import SampleExport, summarize_histogram, run_model, run_simulation, frequency_rows
+from .worker import SimulationWorker
+from .parallel import split_experiments, simulate_parallel, run_parallel
+from .cache import TheoryCache, theory_cache, cached_binomial, cached_model
+from .profiling import StageProfiler, profile_stage
+from .adaptive import StoppingRule, batch_schedule, iter_adaptive, run_adaptive
+from .store import RunStore
+from .plotting import PLOT_POINTS, plot_window, cdf_plot_data
+from .models import (
+    MODELS,
+    TAIL_TOLERANCE,
+    register_model,
+    create_model,
+    ChannelModel,
+    BinomialModel,
+    PoissonModel,
+    GeometricModel,
+    HypergeometricModel,
+    GilbertElliottModel,
+)
@@ -0,0 +1,126 @@
+# Однопроходное накопление выборочных характеристик по пакетам исходов.
+# Исходы целые из [0, n], поэтому вместо самих данных хранится только
+# гистограмма mas_ni, а среднее и дисперсия считаются по Уэлфорду.
+import numpy as np
+
+# Тип столбцов гистограммы и предельное число экспериментов в ней
+HISTOGRAM_DTYPE = np.uint64
+MAX_EXPERIMENTS = int(np.iinfo(HISTOGRAM_DTYPE).max)
+
+
+class StatisticsAccumulator:
+    def __init__(self, n):
+        self.n = n
+        self.histogram = np.zeros(n + 1, dtype=HISTOGRAM_DTYPE)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    @classmethod
+    def from_histogram(cls, mas_ni):
+        mas_ni = np.asarray(mas_ni)
+        if mas_ni.dtype.kind != "u" and (mas_ni < 0).any():
+            raise ValueError("Частоты гистограммы не могут быть отрицательными")
+        mas_ni = mas_ni.astype(HISTOGRAM_DTYPE, copy=False)
+        accumulator = cls(len(mas_ni) - 1)
+        # Сумма в uint64 переполняется молча; вблизи предела она
+        # считается точно, целыми Python
+        if float(mas_ni.sum(dtype=np.float64)) >= 2.0 ** 63:
+            total = int(mas_ni.sum(dtype=object))
+            if total > MAX_EXPERIMENTS:
+                raise OverflowError("Число экспериментов превышает ёмкость гистограммы")
+        else:
+            total = int(mas_ni.sum())
+        if total == 0:
+            return accumulator
+        values = np.arange(len(mas_ni), dtype=np.float64)
+        mean = float(np.dot(values, mas_ni)) / total
+        m2 = float(np.dot((values - mean) ** 2, mas_ni))
+        nonzero = np.flatnonzero(mas_ni)
+        accumulator._combine(mas_ni, total, mean, m2, int(nonzero[0]), int(nonzero[-1]))
+        return accumulator
+
+    def copy(self):
+        snapshot = StatisticsAccumulator(self.n)
+        return snapshot.merge(self)
+
+    def _combine(self, histogram, count, mean, m2, minimum, maximum):
+        # Объединение моментов двух частей (формула Чана для Уэлфорда)
+        total = self.count + count
+        if total > MAX_EXPERIMENTS:
+            raise OverflowError("Число экспериментов превышает ёмкость гистограммы")
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.histogram += histogram.astype(HISTOGRAM_DTYPE, copy=False)
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+
+    def add(self, counts):
+        counts = np.asarray(counts)
+        if counts.size == 0:
+            return self
+        histogram = np.bincount(counts, minlength=self.n + 1)
+        if len(histogram) > self.n + 1 or counts.size <= self.n:
+            # Для моделей с неограниченным носителем последний столбец
+            # гистограммы означает «n и больше», и моменты считаются по самим
+            # исходам; так же и для пакета короче гистограммы
+            values = counts.astype(np.float64)
+            mean = float(values.mean())
+            m2 = float(((values - mean) ** 2).sum())
+            minimum, maximum = int(counts.min()), int(counts.max())
+            if len(histogram) > self.n + 1:
+                histogram[self.n] += histogram[self.n + 1:].sum()
+                histogram = histogram[:self.n + 1]
+        else:
+            # Моменты пакета по его гистограмме: O(n) вместо O(размер пакета)
+            # и без вещественной копии исходов
+            values = np.arange(self.n + 1, dtype=np.float64)
+            mean = float(np.dot(values, histogram)) / counts.size
+            m2 = float(np.dot((values - mean) ** 2, histogram))
+            nonzero = np.flatnonzero(histogram)
+            minimum, maximum = int(nonzero[0]), int(nonzero[-1])
+        self._combine(histogram, counts.size, mean, m2, minimum, maximum)
+        return self
+
+    def merge(self, other):
+        if other.n != self.n:
+            raise ValueError("Нельзя объединить результаты для разных n")
+        if other.count:
+            self._combine(other.histogram, other.count, other.mean, other.m2,
+                          other.minimum, other.maximum)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / self.count
+
+    @property
+    def median(self):
+        # Медиана по накопленным частотам: k-й элемент отсортированной
+        # выборки — первое значение, где cumsum(mas_ni) >= k + 1
+        cumulative = np.cumsum(self.histogram)
+        middle = self.count // 2
+        upper = int(np.searchsorted(cumulative, middle + 1))
+        if self.count % 2:
+            return upper
+        lower = int(np.searchsorted(cumulative, middle))
+        return (lower + upper) / 2
+
+    def statistics(self, p=None, moments=None):
+        # moments — теоретические (Eη, Dη); по умолчанию биномиальные для n, p
+        if self.count == 0:
+            raise ValueError("Нет данных")
+        if moments is None:
+            moments = (self.n * p, self.n * p * (1 - p))
+        return {
+            "Eη": moments[0],
+            "Dη": moments[1],
+            "x̄": self.mean,
+            "S^2": self.variance,
+            "Me": self.median,
+            "R": self.maximum - self.minimum,
+        }
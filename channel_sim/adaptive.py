@@ -0,0 +1,144 @@
+# Адаптивный режим: моделирование растущими пакетами до тех пор, пока
+# не выполнены условия остановки, вместо заранее заданного числа
+# экспериментов.
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from .accumulator import StatisticsAccumulator
+from .cache import cached_model
+from .core import describe_model, profiled_batches, summarize_histogram
+from .engine import generator_for
+from .models import BinomialModel
+from .profiling import profile_stage
+
+DEFAULT_BAND = 0.01
+
+
+class StoppingRule:
+    # Все заданные условия должны выполняться одновременно:
+    #   band     — полуширина доверительной полосы ДКВ для F̂η(x);
+    #   mean_tol — допуск на |Eη - x̄| вместе с полушириной доверительного
+    #              интервала для x̄;
+    #   var_tol  — то же для |Dη - S^2| и S^2.
+    def __init__(self, band=None, mean_tol=None, var_tol=None, confidence=0.95):
+        if band is None and mean_tol is None and var_tol is None:
+            band = DEFAULT_BAND
+        if not (0 < confidence < 1):
+            raise ValueError("Доверительная вероятность должна быть в (0, 1)")
+        for tolerance in (band, mean_tol, var_tol):
+            if tolerance is not None and tolerance <= 0:
+                raise ValueError("Допуски должны быть > 0")
+        self.band = band
+        self.mean_tol = mean_tol
+        self.var_tol = var_tol
+        self.confidence = confidence
+
+    def dkw_epsilon(self, experiments):
+        # Неравенство Дворецкого — Кифера — Вольфовица:
+        # P(sup |F̂ - F| > ε) <= 2 exp(-2 N ε^2)
+        return math.sqrt(math.log(2 / (1 - self.confidence)) / (2 * experiments))
+
+    def required_experiments(self):
+        # Полоса ДКВ не зависит от данных, поэтому нужное для неё число
+        # экспериментов известно заранее: N >= ln(2 / α) / (2 band^2)
+        if self.band is None:
+            return None
+        experiments = math.ceil(math.log(2 / (1 - self.confidence)) / (2 * self.band ** 2))
+        while self.dkw_epsilon(experiments) > self.band:
+            experiments += 1
+        return experiments
+
+    def half_widths(self, result):
+        # Нормальные полуширины доверительных интервалов для x̄ и S^2.
+        # Дисперсия S^2 оценивается через четвёртый центральный момент:
+        # D[S^2] ≈ (μ4 - (N - 3) / (N - 1) σ^4) / N
+        statistics = result["statistics"]
+        experiments = result["experiments"]
+        z = NormalDist().inv_cdf((1 + self.confidence) / 2)
+        variance = statistics["S^2"]
+        mean_width = z * math.sqrt(variance / experiments)
+        if experiments < 2:
+            return mean_width, math.inf
+        mas_ni = np.asarray(result["mas_ni"], dtype=np.float64)
+        deviations = (np.arange(len(mas_ni)) - statistics["x̄"]) ** 2
+        fourth_moment = float(np.dot(deviations ** 2, mas_ni)) / experiments
+        spread = fourth_moment - (experiments - 3) / (experiments - 1) * variance ** 2
+        return mean_width, z * math.sqrt(max(spread, 0.0) / experiments)
+
+    def is_met(self, result):
+        statistics = result["statistics"]
+        if self.band is not None and self.dkw_epsilon(result["experiments"]) > self.band:
+            return False
+        if self.mean_tol is None and self.var_tol is None:
+            return True
+        # Совпадение точечной оценки с допуском может быть случайным:
+        # условие считается выполненным, только если в допуск укладывается
+        # весь доверительный интервал
+        mean_width, variance_width = self.half_widths(result)
+        if (self.mean_tol is not None
+                and abs(statistics["Eη"] - statistics["x̄"]) + mean_width > self.mean_tol):
+            return False
+        if (self.var_tol is not None
+                and abs(statistics["Dη"] - statistics["S^2"]) + variance_width > self.var_tol):
+            return False
+        return True
+
+
+def batch_schedule(max_experiments, initial_batch=1000, growth=2.0, max_batch=1 << 23, target=None):
+    # Размеры пакетов: геометрический рост, но не больше max_batch, чтобы
+    # проверка условий и отмена оставались частыми. Пакет, переходящий
+    # через известное заранее число экспериментов target, обрезается до него
+    done = 0
+    size = initial_batch
+    while done < max_experiments:
+        size = min(size, max_batch, max_experiments - done)
+        if target is not None and done < target:
+            size = min(size, target - done)
+        yield size
+        done += size
+        size = max(size + 1, int(done * (growth - 1)))
+
+
+def iter_adaptive(n, p, max_experiments, rule=None, seed=None, method="binomial", two_sided=False,
+                  initial_batch=1000, growth=2.0, profiler=None, model=None):
+    # После каждого пакета выдаёт (результат, выполнены ли условия);
+    # останавливается при выполнении условий или исчерпании бюджета.
+    # При заданной модели из реестра n, p и method не используются
+    model = model or BinomialModel(n, p, method)
+    if max_experiments <= 0:
+        raise ValueError("Некорректные данные")
+    if growth <= 1 or initial_batch <= 0:
+        raise ValueError("Рост пакетов должен быть > 1, начальный пакет > 0")
+    rule = rule or StoppingRule()
+    rng = generator_for(getattr(model, "method", "binomial"), seed)
+    with profile_stage(profiler, "pmf"):
+        theoretical_probs, theoretical_cdf = cached_model(model)
+
+    accumulator = StatisticsAccumulator(model.support_max)
+    for size in batch_schedule(max_experiments, initial_batch, growth, target=rule.required_experiments()):
+        for counts in profiled_batches(model.batches(size, rng), profiler):
+            with profile_stage(profiler, "statistics"):
+                accumulator.add(counts)
+        result = summarize_histogram(accumulator, getattr(model, "p", None), theoretical_probs,
+                                     two_sided, theoretical_cdf, profiler, model.moments())
+        result["dkw_epsilon"] = rule.dkw_epsilon(accumulator.count)
+        converged = rule.is_met(result)
+        yield result, converged
+        if converged:
+            return
+
+
+def run_adaptive(n, p, max_experiments, rule=None, seed=None, method="binomial", two_sided=False,
+                 initial_batch=1000, growth=2.0, profiler=None, model=None):
+    history = []
+    for result, converged in iter_adaptive(n, p, max_experiments, rule, seed, method, two_sided,
+                                           initial_batch, growth, profiler, model):
+        history.append({"experiments": result["experiments"], "D": result["D"],
+                        "dkw_epsilon": result["dkw_epsilon"]})
+    result["seed"] = seed
+    describe_model(result, model or BinomialModel(n, p, method))
+    result["converged"] = converged
+    result["history"] = history
+    return result
@@ -0,0 +1,129 @@
+# Кэш теоретических таблиц P(η = k) и Fη(x) по ключу (n, p) или модели:
+# LRU в памяти с ограничением объёма и, по желанию, файлы .npy на диске,
+# которые открываются через отображение в память при следующих запусках.
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .theory import binomial_pmf, pmf_to_cdf
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class TheoryCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, max_bytes=None, directory=None):
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+                self._evict()
+            if directory is not None:
+                self.directory = directory or None
+
+    def _paths(self, stem):
+        stem = os.path.join(self.directory, stem)
+        return stem + "_pmf.npy", stem + "_cdf.npy"
+
+    def _load(self, stem):
+        pmf_path, cdf_path = self._paths(stem)
+        if not (os.path.exists(pmf_path) and os.path.exists(cdf_path)):
+            return None
+        return np.load(pmf_path, mmap_mode="r"), np.load(cdf_path, mmap_mode="r")
+
+    def _store(self, stem, pmf, cdf):
+        os.makedirs(self.directory, exist_ok=True)
+        for path, values in zip(self._paths(stem), (pmf, cdf)):
+            # Запись во временный файл и переименование, чтобы параллельные
+            # процессы не прочитали недописанную таблицу
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".npy")
+            with os.fdopen(descriptor, "wb") as stream:
+                np.save(stream, values)
+            os.replace(temporary, path)
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (pmf, cdf) = self._entries.popitem(last=False)
+            self.current_bytes -= pmf.nbytes + cdf.nbytes
+
+    def get_tables(self, key, stem, compute_pmf):
+        # key — ключ в памяти, stem — имя файлов на диске,
+        # compute_pmf — функция, вычисляющая таблицу при промахе
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        tables = self._load(stem) if self.directory else None
+        if tables is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            pmf = compute_pmf()
+            cdf = pmf_to_cdf(pmf)
+            pmf.flags.writeable = False
+            cdf.flags.writeable = False
+            tables = pmf, cdf
+            if self.directory:
+                self._store(stem, pmf, cdf)
+
+        size = tables[0].nbytes + tables[1].nbytes
+        with self._lock:
+            # Другой поток мог уже положить ту же таблицу: её байты учтены
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            if size <= self.max_bytes:
+                self._entries[key] = tables
+                self.current_bytes += size
+                self._evict()
+        return tables
+
+    def get(self, n, p):
+        # p.hex() однозначно задаёт число с плавающей точкой в имени файла
+        return self.get_tables((n, float(p)), f"binom_n{n}_p{float(p).hex()}",
+                               lambda: binomial_pmf(n, p))
+
+    def get_model(self, model):
+        return self.get_tables(model.key(), model.cache_stem(), model.pmf)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "directory": self.directory,
+            }
+
+
+theory_cache = TheoryCache()
+
+
+def cached_binomial(n, p):
+    return theory_cache.get(n, p)
+
+
+def cached_model(model):
+    return theory_cache.get_model(model)
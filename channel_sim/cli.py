@@ -0,0 +1,202 @@
+# Командная строка для пакетных запусков без Tk:
+# python -m channel_sim --n 10 --p 0.3 --experiments 100000 --seed 1
+import argparse
+import csv
+import json
+import sys
+
+from .adaptive import StoppingRule, run_adaptive
+from .cache import theory_cache
+from .core import frequency_rows, run_model, run_simulation
+from .engine import METHODS
+from .exact import divergence_critical_value, divergence_pvalue
+from .models import MODELS, create_model
+from .parallel import run_parallel
+from .profiling import StageProfiler
+from .store import RunStore
+
+FREQUENCY_COLUMNS = ("y_i", "P_eta_y_i", "n_i", "n_i_n", "abs_diff")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="channel_sim",
+                                     description="Моделирование числа искажённых сообщений")
+    parser.add_argument("--model", choices=sorted(MODELS), default="binomial",
+                        help="модель канала (по умолчанию биномиальная)")
+    parser.add_argument("--n", type=int, default=None, help="число сообщений")
+    parser.add_argument("--p", type=float, default=None, help="вероятность искажения")
+    parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="прочие параметры модели, например lam=3 или p_gb=0.01")
+    parser.add_argument("--experiments", type=int, required=True,
+                        help="число экспериментов (в адаптивном режиме — максимальное)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--method", choices=METHODS, default="binomial")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="число процессов; 0 — по числу ядер")
+    parser.add_argument("--two-sided", action="store_true",
+                        help="двусторонняя мера расхождения sup |Fη - F̂η|")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="моделировать растущими пакетами до выполнения условий остановки")
+    parser.add_argument("--band", type=float, default=None,
+                        help="полуширина полосы ДКВ (по умолчанию 0.01, если не заданы допуски)")
+    parser.add_argument("--mean-tol", type=float, default=None, help="допуск на |Eη - x̄|")
+    parser.add_argument("--var-tol", type=float, default=None, help="допуск на |Dη - S^2|")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--initial-batch", type=int, default=1000)
+    parser.add_argument("--exact", action="store_true",
+                        help="точное p-значение и критическое значение D (до 20000 экспериментов)")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="уровень значимости для критического значения D")
+    parser.add_argument("--cache-dir", default=None,
+                        help="каталог для файлов .npy с теоретическими таблицами")
+    parser.add_argument("--export-samples", default=None, metavar="PATH",
+                        help="выгрузить исходы отдельных экспериментов в файл .npy")
+    parser.add_argument("--store", default=None,
+                        help="каталог хранилища прогонов: результат сохраняется в нём")
+    parser.add_argument("--append", default=None, metavar="RUN_ID",
+                        help="дозаписать --experiments экспериментов к сохранённому прогону")
+    parser.add_argument("--profile", action="store_true",
+                        help="добавить замеры по этапам (для CSV — в stderr)")
+    parser.add_argument("--metrics-file", default=None,
+                        help="записать замеры по этапам в файл в формате Prometheus")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    return parser
+
+
+def parse_model_parameters(items):
+    parameters = {}
+    for item in items:
+        key, separator, value = item.partition("=")
+        if not separator:
+            raise ValueError(f"Параметр модели должен иметь вид KEY=VALUE: {item}")
+        try:
+            parameters[key.strip()] = float(value)
+        except ValueError:
+            # Нечисловые параметры, например способ моделирования
+            parameters[key.strip()] = value.strip()
+    return parameters
+
+
+def result_to_json(result):
+    output = {
+        "parameters": {
+            "n": result.get("n"),
+            "p": result["p"],
+            "experiments": result["experiments"],
+            "seed": result["seed"],
+            # Параллельный прогон воспроизводится только при том же числе частей
+            "workers": result.get("workers"),
+            "method": result.get("method"),
+        },
+        "frequencies": [dict(zip(FREQUENCY_COLUMNS, row)) for row in frequency_rows(result)],
+        "statistics": result["statistics"],
+        "D": result["D"],
+        "xn": result["xn"],
+        "p_value": result["p_value"],
+    }
+    # У моделей без параметра n или способа моделирования эти поля не выводятся
+    for key in ("n", "method"):
+        if output["parameters"][key] is None:
+            del output["parameters"][key]
+    if "model" in result:
+        output["parameters"]["model"] = result["model"]
+    if "run_id" in result:
+        output["run_id"] = result["run_id"]
+    if "samples_path" in result:
+        output["samples_path"] = result["samples_path"]
+    if "exact" in result:
+        output["exact"] = result["exact"]
+    if "converged" in result:
+        output["converged"] = result["converged"]
+        output["history"] = result["history"]
+    return output
+
+
+def write_csv(result, stream):
+    writer = csv.writer(stream)
+    writer.writerow(FREQUENCY_COLUMNS)
+    writer.writerows(frequency_rows(result))
+    writer.writerow(())
+    writer.writerow(("parameter", "value"))
+    for name, value in result["statistics"].items():
+        writer.writerow((name, value))
+    writer.writerow(("D", result["D"]))
+    writer.writerow(("xn", result["xn"]))
+    writer.writerow(("p_value", result["p_value"]))
+    if "run_id" in result:
+        writer.writerow(("run_id", result["run_id"]))
+    if "exact" in result:
+        writer.writerow(("exact_p_value", result["exact"]["p_value"]))
+        writer.writerow(("critical_value", result["exact"]["critical_value"]))
+
+
+def simulate(args, profiler=None):
+    model = create_model(args.model, n=args.n, p=args.p, method=args.method,
+                         **parse_model_parameters(args.param))
+    if args.export_samples and (args.adaptive or args.workers != 1):
+        raise ValueError("Выгрузка исходов доступна только без --adaptive и при --workers 1")
+    if args.adaptive and args.workers != 1:
+        raise ValueError("Адаптивный режим выполняется в одном процессе и несовместим с --workers")
+    if args.adaptive:
+        rule = StoppingRule(args.band, args.mean_tol, args.var_tol, args.confidence)
+        return run_adaptive(args.n, args.p, args.experiments, rule, args.seed, args.method,
+                            args.two_sided, args.initial_batch, profiler=profiler, model=model)
+    if args.model != "binomial":
+        if args.workers != 1:
+            raise ValueError("Параллельный режим поддерживает только биномиальную модель")
+        return run_model(model, args.experiments, args.seed, args.two_sided, profiler, args.export_samples)
+    if args.workers == 1:
+        return run_simulation(args.n, args.p, args.experiments, args.seed,
+                              args.method, args.two_sided, profiler, args.export_samples)
+    return run_parallel(args.n, args.p, args.experiments, args.seed, args.workers or None,
+                        args.method, args.two_sided, profiler=profiler)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.cache_dir:
+        theory_cache.configure(directory=args.cache_dir)
+    profiler = StageProfiler(track_allocations=True) if args.profile or args.metrics_file else None
+    try:
+        if args.workers < 0:
+            raise ValueError("Число процессов должно быть >= 0")
+        if args.append and not args.store:
+            raise ValueError("Для дозаписи нужно указать --store")
+        if args.append and args.export_samples:
+            raise ValueError("Выгрузка исходов недоступна при дозаписи")
+        store = RunStore(args.store) if args.store else None
+        two_sided = args.two_sided
+        if args.append:
+            # Модель и вид меры D берутся из сохранённого прогона
+            two_sided = store.entry(args.append)["two_sided"]
+            result = store.extend(args.append, args.experiments, args.seed, profiler)
+        else:
+            result = simulate(args, profiler)
+        if args.exact:
+            result["exact"] = {
+                "alpha": args.alpha,
+                "p_value": divergence_pvalue(result["D"], result["theoretical_probs"],
+                                             result["experiments"], two_sided),
+                "critical_value": divergence_critical_value(args.alpha, result["theoretical_probs"],
+                                                            result["experiments"], two_sided),
+            }
+        if store is not None and not args.append:
+            result["run_id"] = store.save(result, two_sided)
+    except ValueError as error:
+        print(f"Ошибка ввода: {error}", file=sys.stderr)
+        return 2
+
+    if args.format == "json":
+        output = result_to_json(result)
+        if args.profile:
+            output["profile"] = profiler.report()
+        json.dump(output, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        write_csv(result, sys.stdout)
+        if args.profile:
+            json.dump({"profile": profiler.report()}, sys.stderr, ensure_ascii=False, indent=2)
+            sys.stderr.write("\n")
+    if args.metrics_file:
+        profiler.write_prometheus(args.metrics_file)
+    return 0
@@ -0,0 +1,129 @@
+# Полный расчёт одного эксперимента без графического интерфейса:
+# моделирование, теоретическое распределение, характеристики и мера
+# расхождения. Tk и matplotlib здесь не импортируются.
+import numpy as np
+
+from .accumulator import StatisticsAccumulator
+from .cache import cached_model
+from .divergence import divergence_from_histogram
+from .models import BinomialModel
+from .profiling import profile_stage
+
+
+def profiled_batches(batches, profiler=None):
+    # Время генерации каждого пакета учитывается в этапе «simulation»
+    batches = iter(batches)
+    while True:
+        with profile_stage(profiler, "simulation"):
+            counts = next(batches, None)
+        if counts is None:
+            return
+        if profiler is not None:
+            profiler.add_trials("simulation", len(counts))
+        yield counts
+
+
+class SampleExport:
+    # Исходы отдельных экспериментов в файле .npy — только по запросу
+    # пользователя. Файл заполняется по пакетам через отображение в память,
+    # тип — наименьший беззнаковый, вмещающий исходы модели
+    def __init__(self, path, experiments, support_max):
+        self.path = path
+        self.dtype = np.min_scalar_type(support_max)
+        self.samples = np.lib.format.open_memmap(path, mode="w+", dtype=self.dtype, shape=(experiments,))
+        self.count = 0
+
+    def write(self, counts):
+        if counts.size and int(counts.max()) > np.iinfo(self.dtype).max:
+            raise OverflowError("Исход эксперимента не помещается в тип файла выгрузки")
+        self.samples[self.count:self.count + counts.size] = counts
+        self.count += counts.size
+
+    def close(self):
+        # После отмены в файле остаются только выполненные эксперименты
+        samples, self.samples = self.samples, None
+        samples.flush()
+        if self.count < len(samples):
+            done = np.array(samples[:self.count])
+            del samples
+            # Через открытый файл: np.save по имени дописал бы «.npy»
+            # к пути без этого расширения
+            with open(self.path, "wb") as stream:
+                np.save(stream, done)
+
+
+def summarize_histogram(accumulator, p, theoretical_probs, two_sided=False, theoretical_cdf=None,
+                        profiler=None, moments=None):
+    mas_ni = accumulator.histogram
+    with profile_stage(profiler, "divergence"):
+        divergence = divergence_from_histogram(mas_ni, theoretical_probs, two_sided, theoretical_cdf)
+    with profile_stage(profiler, "statistics"):
+        statistics = accumulator.statistics(p, moments)
+    return {
+        "n": accumulator.n,
+        "p": p,
+        "experiments": accumulator.count,
+        "mas_ni": mas_ni,
+        "mas_n": mas_ni / accumulator.count,
+        "theoretical_probs": theoretical_probs,
+        "theoretical_cdf": divergence["theoretical_cdf"],
+        "sample_cdf": divergence["sample_cdf"],
+        "statistics": statistics,
+        "D": divergence["D"],
+        "xn": divergence["xn"],
+        "p_value": divergence["p_value"],
+    }
+
+
+def describe_model(result, model):
+    # Поля результата, задаваемые моделью: n — параметр модели, а не
+    # граница гистограммы (у моделей с неограниченным носителем его нет),
+    # method — только у моделей, для которых он определён
+    result["model"] = model.describe()
+    result["n"] = getattr(model, "n", None)
+    if hasattr(model, "method"):
+        result["method"] = model.method
+    else:
+        result.pop("method", None)
+    return result
+
+
+def run_model(model, experiments, seed=None, two_sided=False, profiler=None, samples_path=None):
+    # Один и тот же расчёт для любой модели из реестра. Исходы отдельных
+    # экспериментов не хранятся, кроме выгрузки в samples_path
+    accumulator = StatisticsAccumulator(model.support_max)
+    export = SampleExport(samples_path, experiments, model.support_max) if samples_path else None
+    try:
+        for counts in profiled_batches(model.batches(experiments, seed), profiler):
+            if export is not None:
+                with profile_stage(profiler, "export"):
+                    export.write(counts)
+            with profile_stage(profiler, "statistics"):
+                accumulator.add(counts)
+    finally:
+        if export is not None:
+            export.close()
+    with profile_stage(profiler, "pmf"):
+        theoretical_probs, theoretical_cdf = cached_model(model)
+    result = summarize_histogram(accumulator, getattr(model, "p", None), theoretical_probs, two_sided,
+                                 theoretical_cdf, profiler, model.moments())
+    result["seed"] = seed
+    describe_model(result, model)
+    if samples_path:
+        result["samples_path"] = samples_path
+    return result
+
+
+def run_simulation(n, p, experiments, seed=None, method="binomial", two_sided=False, profiler=None,
+                   samples_path=None):
+    return run_model(BinomialModel(n, p, method), experiments, seed, two_sided, profiler, samples_path)
+
+
+def frequency_rows(result):
+    # Строки таблицы «Частоты и отклонения»: y_i, P(η=y_i), n_i, n_i/n, |n_i/n - P|
+    rows = []
+    for i, (probability, occurrences, relative_freq) in enumerate(
+            zip(result["theoretical_probs"], result["mas_ni"], result["mas_n"])):
+        rows.append((i, float(probability), int(occurrences), float(relative_freq),
+                     abs(float(relative_freq) - float(probability))))
+    return rows
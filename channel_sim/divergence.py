@@ -0,0 +1,60 @@
+# Мера расхождения между теоретической и выборочной функциями
+# распределения, вычисляемая по гистограмме mas_ni за O(n).
+import math
+
+import numpy as np
+
+from .theory import pmf_to_cdf
+
+
+def sample_cdf_from_histogram(mas_ni):
+    mas_ni = np.asarray(mas_ni)
+    return np.cumsum(mas_ni) / mas_ni.sum()
+
+
+def max_divergence(theoretical_cdf, sample_cdf, two_sided=False):
+    # Односторонняя мера: max(Fη - F̂η), двусторонняя: sup |Fη - F̂η|.
+    # Возвращает (D, xn); при отсутствии положительного отклонения (0, 0)
+    gap = np.asarray(theoretical_cdf) - np.asarray(sample_cdf)
+    if two_sided:
+        gap = np.abs(gap)
+    xn = int(np.argmax(gap))
+    if gap[xn] <= 0:
+        return 0.0, 0
+    return float(gap[xn]), xn
+
+
+def kolmogorov_pvalue(d, experiments, two_sided=False):
+    # Асимптотика Колмогорова (с поправкой Стивенса) для двусторонней
+    # меры и exp(-2 N D^2) для односторонней. Для дискретного
+    # распределения значение консервативно (завышено)
+    if d <= 0:
+        return 1.0
+    sqrt_n = math.sqrt(experiments)
+    if not two_sided:
+        return min(1.0, math.exp(-2 * experiments * d * d))
+    lam = (sqrt_n + 0.12 + 0.11 / sqrt_n) * d
+    if lam < 0.2:
+        return 1.0
+    total = 0.0
+    for k in range(1, 101):
+        term = 2 * (-1) ** (k - 1) * math.exp(-2 * k * k * lam * lam)
+        total += term
+        if abs(term) < 1e-16:
+            break
+    return min(1.0, max(0.0, total))
+
+
+def divergence_from_histogram(mas_ni, theoretical_probs, two_sided=False, theoretical_cdf=None):
+    if theoretical_cdf is None:
+        theoretical_cdf = pmf_to_cdf(theoretical_probs)
+    sample_cdf = sample_cdf_from_histogram(mas_ni)
+    max_diff, xn = max_divergence(theoretical_cdf, sample_cdf, two_sided)
+    experiments = int(np.sum(mas_ni))
+    return {
+        "theoretical_cdf": theoretical_cdf,
+        "sample_cdf": sample_cdf,
+        "D": max_diff,
+        "xn": xn,
+        "p_value": kolmogorov_pvalue(max_diff, experiments, two_sided),
+    }
@@ -0,0 +1,95 @@
+# Векторизованный движок моделирования канала с искажениями:
+# число искажённых сообщений из n в каждом эксперименте.
+import random
+
+import numpy as np
+
+from .accumulator import HISTOGRAM_DTYPE
+
+METHODS = ("binomial", "bernoulli")
+
+# Ограничение на число элементов в одном блоке (экспериментов или
+# случайных чисел), чтобы память не зависела от числа экспериментов
+BINOMIAL_CHUNK = 1 << 20
+BERNOULLI_CHUNK_ELEMENTS = 1 << 22
+
+
+def make_generator(seed=None):
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def python_compatible_generator(seed=None):
+    # MT19937 в том же состоянии, что и random.Random(seed): поэлементный
+    # режим даёт ровно ту же последовательность, что цикл random.random()
+    state = random.Random(seed).getstate()[1]
+    bit_generator = np.random.MT19937()
+    bit_generator.state = {
+        "bit_generator": "MT19937",
+        "state": {"key": np.array(state[:-1], dtype=np.uint32), "pos": state[-1]},
+    }
+    return np.random.Generator(bit_generator)
+
+
+def generator_for(method, seed=None):
+    # Генератор, которым пользуется выбранный метод; уже созданный
+    # Generator возвращается как есть, чтобы продолжать тот же поток
+    if isinstance(seed, np.random.Generator):
+        return seed
+    if method == "bernoulli":
+        return python_compatible_generator(seed)
+    return make_generator(seed)
+
+
+def _check_arguments(n, p, experiments, method):
+    if n <= 0 or not (0 <= p <= 1) or experiments <= 0:
+        raise ValueError("Некорректные данные")
+    if method not in METHODS:
+        raise ValueError(f"Неизвестный метод моделирования: {method}")
+
+
+def _bernoulli_counts(rng, n, p, size):
+    # Случайные числа берутся построчно, поэтому результат не зависит от
+    # разбиения на блоки и совпадает с вложенным циклом по сообщениям
+    if n <= BERNOULLI_CHUNK_ELEMENTS:
+        return np.count_nonzero(rng.random((size, n)) < p, axis=1)
+    counts = np.empty(size, dtype=np.int64)
+    for i in range(size):
+        distorted_count = 0
+        for start in range(0, n, BERNOULLI_CHUNK_ELEMENTS):
+            block = rng.random(min(BERNOULLI_CHUNK_ELEMENTS, n - start))
+            distorted_count += int(np.count_nonzero(block < p))
+        counts[i] = distorted_count
+    return counts
+
+
+def iter_count_batches(n, p, experiments, seed=None, method="binomial", chunk_size=None):
+    _check_arguments(n, p, experiments, method)
+    rng = generator_for(method, seed)
+    if method == "binomial":
+        chunk_size = chunk_size or BINOMIAL_CHUNK
+    else:
+        chunk_size = chunk_size or max(1, BERNOULLI_CHUNK_ELEMENTS // n)
+
+    done = 0
+    while done < experiments:
+        size = min(chunk_size, experiments - done)
+        if method == "binomial":
+            yield rng.binomial(n, p, size=size)
+        else:
+            yield _bernoulli_counts(rng, n, p, size)
+        done += size
+
+
+def simulate_counts(n, p, experiments, seed=None, method="binomial", chunk_size=None):
+    batches = list(iter_count_batches(n, p, experiments, seed, method, chunk_size))
+    return np.concatenate(batches)
+
+
+def simulate_histogram(n, p, experiments, seed=None, method="binomial", chunk_size=None):
+    # mas_ni без хранения исходов отдельных экспериментов
+    mas_ni = np.zeros(n + 1, dtype=HISTOGRAM_DTYPE)
+    for counts in iter_count_batches(n, p, experiments, seed, method, chunk_size):
+        mas_ni += np.bincount(counts, minlength=n + 1).astype(HISTOGRAM_DTYPE)
+    return mas_ni
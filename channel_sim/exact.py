@@ -0,0 +1,251 @@
+# Точное распределение меры расхождения D при заданном числе
+# экспериментов N без моделирования. Накопленные частоты C_k = N F̂η(k)
+# — частичные суммы мультиномиального вектора, поэтому
+#   P(D <= d) = P(L_k <= C_k <= U_k для всех k)
+# вычисляется динамическим программированием по k: частоты заменяются
+# независимыми пуассоновскими с параметрами N P(η = k), а результат
+# делится на P(сумма = N).
+import math
+
+import numpy as np
+
+from .divergence import kolmogorov_pvalue
+from .theory import pmf_to_cdf
+
+# До этого числа экспериментов используется точный расчёт (O(N^2)),
+# дальше — асимптотика Колмогорова, консервативная для дискретного случая
+EXACT_LIMIT = 20000
+
+# Запас на погрешность округления при переводе d в границы для C_k
+_ROUNDING = 1e-9
+# Значения состояния меньше этой доли максимума отбрасываются с краёв:
+# это ниже погрешности округления, зато окно остаётся шириной O(sqrt(N))
+_NEGLIGIBLE = 1e-16
+# Короче этого свёртка считается напрямую, длиннее — через БПФ
+_FFT_MIN_LENGTH = 64
+
+
+def _bounds(cdf, experiments, d, two_sided, strict):
+    # Границы L_k, U_k для C_k, при которых отклонение в точке k не
+    # превышает d (strict — строго меньше d)
+    target = experiments * np.asarray(cdf, dtype=np.float64)
+    if strict:
+        lower = np.floor(target - experiments * d + _ROUNDING) + 1
+        upper = np.ceil(target + experiments * d - _ROUNDING) - 1
+    else:
+        lower = np.ceil(target - experiments * d - _ROUNDING)
+        upper = np.floor(target + experiments * d + _ROUNDING)
+    lower = np.clip(lower, 0, experiments).astype(np.int64)
+    if two_sided:
+        upper = np.clip(upper, -1, experiments).astype(np.int64)
+    else:
+        upper = np.full(len(target), experiments, dtype=np.int64)
+    return lower, upper
+
+
+def _poisson_kernel(lam, experiments, log_factorial):
+    # (m0, P(Пуассон(lam) = m) при m = m0, m0 + 1, ...) на отрезке, где
+    # сосредоточена практически вся масса
+    if lam <= 0:
+        return 0, np.ones(1)
+    spread = 12 * math.sqrt(lam) + 30
+    start = max(0, int(lam - spread))
+    stop = min(experiments, int(lam + spread)) + 1
+    m = np.arange(start, stop)
+    return start, np.exp(m * math.log(lam) - lam - log_factorial[start:stop])
+
+
+def _convolve(state, kernel):
+    if min(len(state), len(kernel)) < _FFT_MIN_LENGTH:
+        return np.convolve(state, kernel)
+    size = len(state) + len(kernel) - 1
+    fft_size = 1 << (size - 1).bit_length()
+    result = np.fft.irfft(np.fft.rfft(state, fft_size) * np.fft.rfft(kernel, fft_size), fft_size)[:size]
+    # Погрешность БПФ может дать малые отрицательные значения
+    return np.maximum(result, 0.0)
+
+
+def rectangle_probability(theoretical_probs, experiments, lower, upper):
+    # P(L_k <= C_k <= U_k для всех k) для мультиномиальной выборки объёма N.
+    # Состояние хранится окном state[i] = P(C_k = offset + i): вне окна
+    # вероятность пренебрежимо мала или запрещена границами
+    probs = np.asarray(theoretical_probs, dtype=np.float64)
+    probs = probs / probs.sum()
+    log_factorial = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, experiments + 1)))))
+
+    state = np.ones(1)
+    offset = 0
+    log_scale = 0.0
+    # Пока границы не ограничивают C_k, соседние категории объединяются:
+    # сумма независимых пуассоновских величин — пуассоновская. Так же
+    # пропускаются хвостовые категории с пренебрежимой массой, если их
+    # границы совпадают с уже применёнными
+    pending = 0.0
+    applied = None
+    for k, probability in enumerate(probs):
+        pending += experiments * probability
+        if k < len(probs) - 1 and ((lower[k] <= 0 and upper[k] >= experiments)
+                                   or (pending < _NEGLIGIBLE and applied == (lower[k], upper[k]))):
+            continue
+        applied = (lower[k], upper[k])
+        if pending > 0:
+            start, kernel = _poisson_kernel(pending, experiments, log_factorial)
+            state = _convolve(state, kernel)
+            offset += start
+            pending = 0.0
+        low = max(int(lower[k]), offset)
+        high = min(int(upper[k]), experiments, offset + len(state) - 1)
+        if low > high:
+            return 0.0
+        state = state[low - offset:high - offset + 1]
+        offset = low
+        peak = state.max()
+        if peak == 0:
+            return 0.0
+        kept = np.flatnonzero(state > peak * _NEGLIGIBLE)
+        state = state[kept[0]:kept[-1] + 1]
+        offset += int(kept[0])
+        # Нормировка, чтобы не уйти в машинный ноль на длинных носителях
+        total = state.sum()
+        state /= total
+        log_scale += math.log(total)
+
+    log_denominator = experiments * math.log(experiments) - experiments - log_factorial[experiments]
+    if not offset <= experiments < offset + len(state) or state[experiments - offset] == 0:
+        return 0.0
+    return min(1.0, math.exp(log_scale + math.log(state[experiments - offset]) - log_denominator))
+
+
+def exact_divergence_cdf(d, theoretical_probs, experiments, two_sided=False, strict=False):
+    # P(D <= d) (или P(D < d) при strict) для одно- или двусторонней меры
+    if d < 0 or (strict and d == 0):
+        return 0.0
+    cdf = pmf_to_cdf(theoretical_probs)
+    lower, upper = _bounds(cdf, experiments, d, two_sided, strict)
+    if np.any(lower > upper):
+        return 0.0
+    return rectangle_probability(theoretical_probs, experiments, lower, upper)
+
+
+def divergence_pvalue(d, theoretical_probs, experiments, two_sided=False, exact_limit=EXACT_LIMIT):
+    # P(D >= d) при верной гипотезе о биномиальном распределении
+    if d <= 0:
+        return 1.0
+    if experiments > exact_limit:
+        return kolmogorov_pvalue(d, experiments, two_sided)
+    return max(0.0, 1.0 - exact_divergence_cdf(d, theoretical_probs, experiments, two_sided,
+                                               strict=True))
+
+
+def divergence_values(cdf, experiments, low, high, two_sided=False):
+    # Возможные значения D на отрезке [low, high] по возрастанию:
+    # D = max_k (F_k - C_k / N) (или |F_k - C_k / N|) при целых C_k
+    cdf = np.asarray(cdf, dtype=np.float64)
+    signs = (1, -1) if two_sided else (1,)
+    values = [np.zeros(1)] if low <= 0 else []
+    for sign in signs:
+        # sign (F_k - c / N) в [low, high] при c от first до last
+        bounds = (experiments * (cdf - sign * high), experiments * (cdf - sign * low))
+        first = np.clip(np.ceil(np.minimum(*bounds) - _ROUNDING), 0, experiments).astype(np.int64)
+        last = np.clip(np.floor(np.maximum(*bounds) + _ROUNDING), -1, experiments).astype(np.int64)
+        counts = np.maximum(last - first + 1, 0)
+        c = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        values.append(sign * (np.repeat(cdf, counts) - c / experiments))
+    values = np.concatenate(values)
+    return np.unique(values[(values >= low) & (values <= high)])
+
+
+def _smallest_value_above(cdf, experiments, d, two_sided=False):
+    # Наименьшее возможное значение D, не меньшее d
+    cdf = np.asarray(cdf, dtype=np.float64)
+    c = np.floor(experiments * (cdf - d) + _ROUNDING)
+    values = cdf - c / experiments
+    if two_sided:
+        c = np.ceil(experiments * (cdf + d) - _ROUNDING)
+        values = np.concatenate((values, c / experiments - cdf))
+    return float(values[values >= d - _ROUNDING / experiments].min())
+
+
+def divergence_critical_value(alpha, theoretical_probs, experiments, two_sided=False,
+                              exact_limit=EXACT_LIMIT, tolerance=1e-6):
+    # Наименьшее возможное значение c меры D, при котором P(D > c) <= alpha
+    if not (0 < alpha < 1):
+        raise ValueError("Уровень значимости должен быть в (0, 1)")
+    cdf = pmf_to_cdf(theoretical_probs)
+    # Обращение асимптотики бисекцией: она консервативна и задаёт
+    # начальную верхнюю границу
+    low, high = 0.0, 1.0
+    while high - low > tolerance:
+        middle = (low + high) / 2
+        if kolmogorov_pvalue(middle, experiments, two_sided) <= alpha:
+            high = middle
+        else:
+            low = middle
+    if experiments > exact_limit:
+        return _smallest_value_above(cdf, experiments, high, two_sided)
+
+    # P(D > c) меняется только в возможных значениях D, поэтому
+    # двоичный поиск идёт по ним: около log2(числа значений) расчётов
+    survival = lambda c: 1.0 - exact_divergence_cdf(c, theoretical_probs, experiments, two_sided)
+    while high < 1 and survival(high) > alpha:
+        high = min(1.0, 2 * high)
+    values = divergence_values(cdf, experiments, 0.0, high, two_sided)
+    first, last = 0, len(values) - 1
+    while first < last:
+        middle = (first + last) // 2
+        if survival(values[middle]) <= alpha:
+            last = middle
+        else:
+            first = middle + 1
+    return float(values[last])
+
+
+def build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="channel_sim.exact",
+                                     description="Критическое значение и p-значение меры D без моделирования")
+    parser.add_argument("--n", type=int, required=True)
+    parser.add_argument("--p", type=float, required=True)
+    parser.add_argument("--experiments", type=int, required=True)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--d", type=float, default=None, help="наблюдаемое D для p-значения")
+    parser.add_argument("--two-sided", action="store_true")
+    return parser
+
+
+def main(argv=None):
+    import json
+    import sys
+
+    from .cache import cached_binomial
+
+    args = build_parser().parse_args(argv)
+    try:
+        if args.experiments <= 0:
+            raise ValueError("Число экспериментов должно быть > 0")
+        theoretical_probs, _ = cached_binomial(args.n, args.p)
+        output = {
+            "n": args.n,
+            "p": args.p,
+            "experiments": args.experiments,
+            "two_sided": args.two_sided,
+            "exact": args.experiments <= EXACT_LIMIT,
+            "alpha": args.alpha,
+            "critical_value": divergence_critical_value(args.alpha, theoretical_probs,
+                                                        args.experiments, args.two_sided),
+        }
+        if args.d is not None:
+            output["D"] = args.d
+            output["p_value"] = divergence_pvalue(args.d, theoretical_probs, args.experiments,
+                                                  args.two_sided)
+    except ValueError as error:
+        print(f"Ошибка ввода: {error}", file=sys.stderr)
+        return 2
+    json.dump(output, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
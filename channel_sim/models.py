@@ -0,0 +1,390 @@
+# Реестр моделей канала. Каждая модель задаёт векторизованный генератор
+# пакетов исходов, устойчивое вычисление P(η = k) и точные Eη, Dη, после
+# чего таблицы, характеристики, мера расхождения и график строятся
+# одинаково для любой модели.
+import math
+
+import numpy as np
+
+from .cache import theory_cache
+from .engine import (
+    BINOMIAL_CHUNK,
+    METHODS,
+    iter_count_batches,
+    make_generator,
+)
+from .theory import binomial_pmf
+
+MODELS = {}
+
+# Для моделей с неограниченным носителем гистограмма обрезается там, где
+# остаток вероятности меньше этого порога; последний столбец — «k и больше»
+TAIL_TOLERANCE = 1e-15
+
+
+def register_model(cls):
+    MODELS[cls.name] = cls
+    return cls
+
+
+def create_model(name, **values):
+    # Берёт из values только параметры выбранной модели
+    if name not in MODELS:
+        raise ValueError(f"Неизвестная модель: {name}")
+    cls = MODELS[name]
+    missing = [parameter for parameter in cls.parameters if values.get(parameter) is None]
+    if missing:
+        raise ValueError(f"Не заданы параметры модели {name}: {', '.join(missing)}")
+    optional = {key: values[key] for key in cls.optional if values.get(key) is not None}
+    return cls(**{parameter: values[parameter] for parameter in cls.parameters}, **optional)
+
+
+def _log_factorials(count):
+    return np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, count + 1, dtype=np.float64)))))
+
+
+def _close_tail(pmf):
+    # Остаток вероятности относится к последнему столбцу, чтобы Fη(max) = 1
+    pmf[-1] += max(0.0, 1.0 - pmf.sum())
+    return pmf
+
+
+class ChannelModel:
+    name = None
+    parameters = ()
+    optional = ()
+    chunk_size = BINOMIAL_CHUNK
+
+    @property
+    def support_max(self):
+        raise NotImplementedError
+
+    def sample(self, rng, size):
+        raise NotImplementedError
+
+    def pmf(self):
+        raise NotImplementedError
+
+    def moments(self):
+        raise NotImplementedError
+
+    def describe(self):
+        return {"model": self.name, **{key: getattr(self, key) for key in self.parameters + self.optional}}
+
+    def key(self):
+        # Необязательные параметры задают способ моделирования и не влияют
+        # на теоретическое распределение
+        return (self.name,) + tuple(getattr(self, key) for key in self.parameters)
+
+    def cache_stem(self):
+        parts = []
+        for key in self.parameters:
+            value = getattr(self, key)
+            parts.append(f"{key}{value.hex() if isinstance(value, float) else value}")
+        return "_".join([self.name.replace("-", "_")] + parts)
+
+    def batches(self, experiments, seed=None, chunk_size=None):
+        if experiments <= 0:
+            raise ValueError("Некорректные данные")
+        rng = make_generator(seed)
+        chunk_size = chunk_size or self.chunk_size
+        done = 0
+        while done < experiments:
+            size = min(chunk_size, experiments - done)
+            yield self.sample(rng, size)
+            done += size
+
+
+@register_model
+class BinomialModel(ChannelModel):
+    # Число искажённых из n независимых сообщений
+    name = "binomial"
+    parameters = ("n", "p")
+    optional = ("method",)
+
+    def __init__(self, n, p, method="binomial"):
+        n, p = int(n), float(p)
+        if n <= 0 or not (0 <= p <= 1):
+            raise ValueError("Некорректные данные")
+        if method not in METHODS:
+            raise ValueError(f"Неизвестный метод моделирования: {method}")
+        self.n = n
+        self.p = p
+        self.method = method
+
+    def key(self):
+        # Теоретические таблицы не зависят от метода моделирования
+        return (self.n, self.p)
+
+    def cache_stem(self):
+        return f"binom_n{self.n}_p{self.p.hex()}"
+
+    @property
+    def support_max(self):
+        return self.n
+
+    def batches(self, experiments, seed=None, chunk_size=None):
+        return iter_count_batches(self.n, self.p, experiments, seed, self.method, chunk_size)
+
+    def sample(self, rng, size):
+        return rng.binomial(self.n, self.p, size=size)
+
+    def pmf(self):
+        return binomial_pmf(self.n, self.p)
+
+    def moments(self):
+        return self.n * self.p, self.n * self.p * (1 - self.p)
+
+
+@register_model
+class PoissonModel(ChannelModel):
+    # Число искажений при потоке ошибок интенсивности lam
+    name = "poisson"
+    parameters = ("lam",)
+
+    def __init__(self, lam):
+        lam = float(lam)
+        if lam < 0:
+            raise ValueError("Интенсивность должна быть >= 0")
+        self.lam = lam
+
+    @property
+    def support_max(self):
+        # Граница Чернова для хвоста Пуассона с большим запасом
+        return int(math.ceil(self.lam + 12 * math.sqrt(self.lam) + 40))
+
+    def sample(self, rng, size):
+        return rng.poisson(self.lam, size=size)
+
+    def pmf(self):
+        k = np.arange(self.support_max + 1, dtype=np.float64)
+        if self.lam == 0:
+            pmf = np.zeros(len(k))
+            pmf[0] = 1.0
+            return pmf
+        log_pmf = k * math.log(self.lam) - self.lam - _log_factorials(self.support_max)
+        return _close_tail(np.exp(log_pmf))
+
+    def moments(self):
+        return self.lam, self.lam
+
+
+@register_model
+class GeometricModel(ChannelModel):
+    # Номер первого искажённого сообщения (1, 2, ...)
+    name = "geometric"
+    parameters = ("p",)
+
+    def __init__(self, p):
+        p = float(p)
+        if not (0 < p <= 1):
+            raise ValueError("Вероятность искажения должна быть в (0, 1]")
+        self.p = p
+
+    @property
+    def support_max(self):
+        if self.p == 1:
+            return 1
+        return max(1, int(math.ceil(math.log(TAIL_TOLERANCE) / math.log1p(-self.p))) + 1)
+
+    def sample(self, rng, size):
+        return rng.geometric(self.p, size=size)
+
+    def pmf(self):
+        pmf = np.zeros(self.support_max + 1)
+        k = np.arange(1, self.support_max + 1, dtype=np.float64)
+        if self.p == 1:
+            pmf[1] = 1.0
+            return pmf
+        pmf[1:] = np.exp(math.log(self.p) + (k - 1) * math.log1p(-self.p))
+        return _close_tail(pmf)
+
+    def moments(self):
+        return 1 / self.p, (1 - self.p) / self.p ** 2
+
+
+@register_model
+class HypergeometricModel(ChannelModel):
+    # Число искажённых среди n сообщений, выбранных без возвращения из
+    # пакета размера population, где искажено defective сообщений
+    name = "hypergeometric"
+    parameters = ("population", "defective", "n")
+
+    def __init__(self, population, defective, n):
+        population, defective, n = int(population), int(defective), int(n)
+        if population <= 0 or not (0 <= defective <= population) or not (0 < n <= population):
+            raise ValueError("Некорректные параметры гипергеометрической модели")
+        self.population = population
+        self.defective = defective
+        self.n = n
+
+    @property
+    def support_max(self):
+        return min(self.n, self.defective)
+
+    def sample(self, rng, size):
+        return rng.hypergeometric(self.defective, self.population - self.defective, self.n, size=size)
+
+    def pmf(self):
+        # Только на носителе [lo, hi], без таблицы факториалов до population:
+        # P(k+1) / P(k) = (K - k)(n - k) / ((k + 1)(N - K - n + k + 1)),
+        # логарифмы отношений накапливаются от моды, а результат нормируется
+        N, K, n = self.population, self.defective, self.n
+        lo, hi = max(0, n - (N - K)), self.support_max
+        k = np.arange(lo, hi, dtype=np.float64)
+        log_ratio = np.log(K - k) + np.log(n - k) - np.log(k + 1) - np.log(N - K - n + k + 1)
+        mode = min(max((n + 1) * (K + 1) // (N + 2), lo), hi)
+        i = mode - lo
+        log_pmf = np.zeros(hi - lo + 1)
+        log_pmf[i + 1:] = np.cumsum(log_ratio[i:])
+        log_pmf[:i] = -np.cumsum(log_ratio[:i][::-1])[::-1]
+        pmf = np.zeros(hi + 1)
+        pmf[lo:] = np.exp(log_pmf)
+        return pmf / pmf.sum()
+
+    def moments(self):
+        N, K, n = self.population, self.defective, self.n
+        mean = n * K / N
+        variance = mean * (N - K) / N * (N - n) / (N - 1) if N > 1 else 0.0
+        return mean, variance
+
+
+@register_model
+class GilbertElliottModel(ChannelModel):
+    # Канал Гилберта — Эллиота: скрытая марковская цепь с «хорошим» и
+    # «плохим» состояниями, вероятности искажения e_good и e_bad, переходы
+    # p_gb (хорошее → плохое) и p_bg (плохое → хорошее). Начальное
+    # состояние берётся из стационарного распределения.
+    name = "gilbert-elliott"
+    parameters = ("n", "p_gb", "p_bg", "e_good", "e_bad")
+    optional = ("sampler",)
+    chunk_size = 1 << 16
+
+    SAMPLERS = ("auto", "occupancy", "sojourn", "message")
+
+    def __init__(self, n, p_gb, p_bg, e_good, e_bad, sampler="auto"):
+        n = int(n)
+        p_gb, p_bg, e_good, e_bad = float(p_gb), float(p_bg), float(e_good), float(e_bad)
+        if n <= 0 or not all(0 <= value <= 1 for value in (p_gb, p_bg, e_good, e_bad)):
+            raise ValueError("Некорректные параметры модели Гилберта — Эллиота")
+        if p_gb + p_bg == 0:
+            raise ValueError("Хотя бы одна из вероятностей перехода должна быть > 0")
+        if sampler not in self.SAMPLERS:
+            raise ValueError(f"Неизвестный способ моделирования: {sampler}")
+        self.n = n
+        self.p_gb = p_gb
+        self.p_bg = p_bg
+        self.e_good = e_good
+        self.e_bad = e_bad
+        self.sampler = sampler
+
+    @property
+    def support_max(self):
+        return self.n
+
+    @property
+    def stationary_bad(self):
+        return self.p_gb / (self.p_gb + self.p_bg)
+
+    def sample(self, rng, size):
+        # При известной траектории состояний искажения независимы, и число
+        # искажений — B(n - T, e_good) + B(T, e_bad), где T — время в плохом
+        # состоянии. По умолчанию T берётся обращением его точной функции
+        # распределения за O(log n) на эксперимент при любой частоте
+        # переходов; «sojourn» и «message» моделируют саму цепь
+        if self.sampler == "sojourn":
+            return self._sample_sojourns(rng, size)
+        if self.sampler == "message":
+            return self._sample_messages(rng, size)
+        return self._errors_given_bad_time(rng, self._sample_bad_time(rng, size))
+
+    def _errors_given_bad_time(self, rng, bad_time):
+        return rng.binomial(self.n - bad_time, self.e_good) + rng.binomial(bad_time, self.e_bad)
+
+    def bad_time_pmf(self):
+        # Прямой проход по сообщениям, как в pmf(): совместное
+        # распределение (состояние, T) за O(n^2)
+        good = np.zeros(self.n + 1)
+        bad = np.zeros(self.n + 1)
+        good[0] = 1 - self.stationary_bad
+        bad[0] = self.stationary_bad
+        for _ in range(self.n):
+            bad_counted = np.zeros(self.n + 1)
+            bad_counted[1:] = bad[:-1]
+            good, bad = (good * (1 - self.p_gb) + bad_counted * self.p_bg,
+                         good * self.p_gb + bad_counted * (1 - self.p_bg))
+        return good + bad
+
+    def _sample_bad_time(self, rng, size):
+        # Таблица строится один раз и хранится в том же кэше, что и P(η = k)
+        _, cdf = theory_cache.get_tables(self.key() + ("bad_time",), self.cache_stem() + "_bad_time",
+                                         self.bad_time_pmf)
+        bad_time = np.searchsorted(cdf, rng.random(size), side="right")
+        # Последнее значение функции распределения T может быть чуть меньше 1
+        return np.minimum(bad_time, self.n)
+
+    def _sample_sojourns(self, rng, size):
+        # Длина пребывания в состоянии s — геометрическая с параметром
+        # вероятности выхода q: floor(E / -ln(1 - q)) + 1 при E ~ Exp(1).
+        # Цикл по участкам копит только время в плохом состоянии
+        with np.errstate(divide="ignore"):
+            # При нулевой вероятности выхода участок длится до конца
+            rate = -np.log1p(-np.array([self.p_gb, self.p_bg]))
+        bad_time = np.zeros(size, dtype=np.int64)
+        active = np.arange(size)
+        state = (rng.random(size) < self.stationary_bad).astype(np.intp)
+        remaining = np.full(size, self.n, dtype=np.int64)
+        while active.size:
+            with np.errstate(divide="ignore"):
+                length = np.floor(rng.standard_exponential(active.size) / rate[state]) + 1
+            length = np.minimum(length, remaining).astype(np.int64)
+            bad_time[active] += length * state
+            remaining -= length
+            keep = remaining > 0
+            active = active[keep]
+            state = 1 - state[keep]
+            remaining = remaining[keep]
+        return self._errors_given_bad_time(rng, bad_time)
+
+    def _sample_messages(self, rng, size):
+        # Поочерёдно по сообщениям, но сразу для всех экспериментов пакета
+        bad = rng.random(size) < self.stationary_bad
+        error_probability = np.array([self.e_good, self.e_bad])
+        switch_probability = np.array([self.p_gb, self.p_bg])
+        counts = np.zeros(size, dtype=np.int64)
+        for _ in range(self.n):
+            state = bad.astype(np.intp)
+            counts += rng.random(size) < error_probability[state]
+            bad ^= rng.random(size) < switch_probability[state]
+        return counts
+
+    def pmf(self):
+        # Прямой проход по сообщениям: совместное распределение
+        # (состояние, число искажений) за O(n^2)
+        good = np.zeros(self.n + 1)
+        bad = np.zeros(self.n + 1)
+        good[0] = 1 - self.stationary_bad
+        bad[0] = self.stationary_bad
+        for _ in range(self.n):
+            good_emitted = good * (1 - self.e_good)
+            good_emitted[1:] += good[:-1] * self.e_good
+            bad_emitted = bad * (1 - self.e_bad)
+            bad_emitted[1:] += bad[:-1] * self.e_bad
+            good = good_emitted * (1 - self.p_gb) + bad_emitted * self.p_bg
+            bad = good_emitted * self.p_gb + bad_emitted * (1 - self.p_bg)
+        return good + bad
+
+    def moments(self):
+        # Сумма n зависимых индикаторов: Cov(X_i, X_j) убывает как λ^|i-j|,
+        # λ = 1 - p_gb - p_bg
+        pi_bad = self.stationary_bad
+        rate = (1 - pi_bad) * self.e_good + pi_bad * self.e_bad
+        lam = 1 - self.p_gb - self.p_bg
+        covariance = (self.e_bad - self.e_good) ** 2 * pi_bad * (1 - pi_bad)
+        n = self.n
+        if lam == 1:
+            lagged = n * (n - 1) / 2
+        else:
+            # sum_{d=1}^{n-1} (n - d) λ^d
+            lagged = lam * (n * (1 - lam) - (1 - lam ** n)) / (1 - lam) ** 2
+        return n * rate, n * rate * (1 - rate) + 2 * covariance * lagged
@@ -0,0 +1,81 @@
+# Параллельное моделирование на нескольких процессах. Каждый процесс
+# получает свой поток случайных чисел SeedSequence.spawn и возвращает
+# только гистограмму и моменты, которые затем объединяются по порядку,
+# поэтому результат однозначно определяется парой (seed, workers).
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .accumulator import StatisticsAccumulator
+from .core import summarize_histogram
+from .engine import _check_arguments, iter_count_batches
+from .models import BinomialModel
+from .profiling import profile_stage
+from .cache import cached_binomial
+
+
+def split_experiments(experiments, workers):
+    share, remainder = divmod(experiments, workers)
+    return [share + (1 if i < remainder else 0) for i in range(workers)]
+
+
+def _child_generator(seed_sequence, method):
+    if method == "bernoulli":
+        return np.random.Generator(np.random.MT19937(seed_sequence))
+    return np.random.default_rng(seed_sequence)
+
+
+def simulate_share(n, p, experiments, seed_sequence, method="binomial"):
+    accumulator = StatisticsAccumulator(n)
+    if experiments == 0:
+        return accumulator
+    rng = _child_generator(seed_sequence, method)
+    for counts in iter_count_batches(n, p, experiments, rng, method):
+        accumulator.add(counts)
+    return accumulator
+
+
+def simulate_parallel(n, p, experiments, seed=None, workers=None, method="binomial", executor=None,
+                      profiler=None):
+    # Возвращает объединённый StatisticsAccumulator и энтропию SeedSequence,
+    # по которой запуск можно повторить
+    _check_arguments(n, p, experiments, method)
+    workers = workers or os.cpu_count() or 1
+    seed_sequence = np.random.SeedSequence(seed)
+    children = seed_sequence.spawn(workers)
+    shares = split_experiments(experiments, workers)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    # Этапы внутри процессов не видны, поэтому замеряется весь расчёт
+    # целиком. Процессорное время рабочих процессов становится известно
+    # только после их завершения, поэтому собственный пул закрывается
+    # внутри замера; время процессов переданного пула не измеряется
+    with profile_stage(profiler, "simulation", experiments, cpu="children" if own_executor else None):
+        try:
+            futures = [executor.submit(simulate_share, n, p, share, child, method)
+                       for share, child in zip(shares, children)]
+            accumulator = StatisticsAccumulator(n)
+            for future in futures:
+                accumulator.merge(future.result())
+        finally:
+            if own_executor:
+                executor.shutdown(cancel_futures=True)
+    return accumulator, seed_sequence.entropy
+
+
+def run_parallel(n, p, experiments, seed=None, workers=None, method="binomial", two_sided=False,
+                 executor=None, profiler=None):
+    accumulator, entropy = simulate_parallel(n, p, experiments, seed, workers, method, executor,
+                                             profiler)
+    with profile_stage(profiler, "pmf"):
+        theoretical_probs, theoretical_cdf = cached_binomial(n, p)
+    result = summarize_histogram(accumulator, p, theoretical_probs, two_sided, theoretical_cdf,
+                                 profiler)
+    result["seed"] = entropy
+    result["method"] = method
+    result["workers"] = workers or os.cpu_count() or 1
+    result["model"] = BinomialModel(n, p, method).describe()
+    return result
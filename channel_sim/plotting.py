@@ -0,0 +1,43 @@
+# Подготовка данных графика функций распределения для больших n без
+# matplotlib: обрезка до области, где Fη или F̂η заметно отличаются от 0
+# и 1, и прореживание точек с сохранением ступенчатой формы и точки xn.
+import numpy as np
+
+# Столько точек на кривую заведомо хватает для графика шириной ~600 px
+PLOT_POINTS = 2000
+# Значения ближе к 0 или 1 на графике неотличимы от них
+PLOT_TOLERANCE = 1e-9
+
+
+def plot_window(theoretical_cdf, sample_cdf, tolerance=PLOT_TOLERANCE):
+    # Отрезок [lo, hi], вне которого обе функции равны 0 или 1 с точностью
+    # tolerance; слева оставляется одна нулевая ступень. Функции
+    # неубывающие, поэтому границы находятся двоичным поиском за O(log n)
+    last = len(theoretical_cdf) - 1
+    lo = min(np.searchsorted(cdf, tolerance, side="right") for cdf in (theoretical_cdf, sample_cdf))
+    hi = max(np.searchsorted(cdf, 1 - tolerance, side="left") for cdf in (theoretical_cdf, sample_cdf))
+    lo, hi = max(min(int(lo), last) - 1, 0), min(int(hi), last)
+    # Хотя бы одна ступень даже для вырожденного распределения
+    return lo, max(hi, min(lo + 1, last))
+
+
+def cdf_plot_data(theoretical_cdf, sample_cdf, xn=None, max_points=PLOT_POINTS, tolerance=PLOT_TOLERANCE):
+    # Точки x и значения обеих функций для ax.step(where="post").
+    # Обе функции неубывающие, поэтому в каждой группе из step соседних
+    # точек достаточно первой и последней: ступенька внутри группы уже
+    # пиксела. Точки xn и xn + 1 сохраняются всегда, чтобы отклонение D
+    # на графике было точным
+    theoretical_cdf = np.asarray(theoretical_cdf)
+    sample_cdf = np.asarray(sample_cdf)
+    lo, hi = plot_window(theoretical_cdf, sample_cdf, tolerance)
+    if xn is not None:
+        lo, hi = min(lo, xn), max(hi, min(xn + 1, len(theoretical_cdf) - 1))
+    step = max(1, -(-2 * (hi - lo + 1) // max_points))
+    if step == 1:
+        x = np.arange(lo, hi + 1)
+    else:
+        keep = [np.arange(lo, hi + 1, step), np.arange(lo + step - 1, hi + 1, step), [lo, hi]]
+        if xn is not None:
+            keep.append([xn, min(xn + 1, hi)])
+        x = np.unique(np.concatenate(keep))
+    return x, theoretical_cdf[x], sample_cdf[x]
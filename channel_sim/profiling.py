@@ -0,0 +1,119 @@
+# Замеры по этапам расчёта: время (настенное и процессорное), пиковый
+# объём выделенной памяти (через tracemalloc, по желанию) и число
+# экспериментов в секунду. Результаты можно передать в callback или
+# записать в текстовый файл в формате Prometheus.
+import contextlib
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # В Windows процессорное время дочерних процессов не измеряется
+    resource = None
+
+
+def _children_cpu_time():
+    # Время только завершённых и дождавшихся родителя дочерних процессов
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class StageProfiler:
+    def __init__(self, track_allocations=False, callback=None):
+        self.track_allocations = track_allocations
+        self.callback = callback
+        self.stages = {}
+
+    def _record(self, name):
+        if name not in self.stages:
+            self.stages[name] = {
+                "stage": name,
+                "calls": 0,
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+                "peak_allocated_bytes": 0,
+                "trials": 0,
+            }
+        return self.stages[name]
+
+    @contextlib.contextmanager
+    def stage(self, name, trials=0, cpu="thread"):
+        # Повторные входы в этап с тем же именем суммируются. cpu — чьё
+        # процессорное время учитывать: "thread" — текущего потока,
+        # "children" — ещё и дочерних процессов, завершённых внутри этапа,
+        # None — не измерять (этап выполняется в чужих процессах), тогда
+        # cpu_seconds этапа равно None
+        if cpu == "children" and resource is None:
+            cpu = None
+        own_tracing = self.track_allocations and not tracemalloc.is_tracing()
+        if own_tracing:
+            tracemalloc.start()
+        if self.track_allocations:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        start_children = _children_cpu_time() if cpu == "children" else 0.0
+        try:
+            yield
+        finally:
+            record = self._record(name)
+            record["calls"] += 1
+            record["wall_seconds"] += time.perf_counter() - start_wall
+            if cpu is None or record["cpu_seconds"] is None:
+                record["cpu_seconds"] = None
+            else:
+                record["cpu_seconds"] += time.thread_time() - start_cpu
+                if cpu == "children":
+                    record["cpu_seconds"] += _children_cpu_time() - start_children
+            record["trials"] += trials
+            if self.track_allocations:
+                peak = tracemalloc.get_traced_memory()[1] - start_memory
+                record["peak_allocated_bytes"] = max(record["peak_allocated_bytes"], peak)
+                if own_tracing:
+                    tracemalloc.stop()
+            if self.callback is not None:
+                self.callback(dict(record))
+
+    def add_trials(self, name, trials):
+        self._record(name)["trials"] += trials
+
+    def report(self):
+        stages = []
+        for record in self.stages.values():
+            record = dict(record)
+            if record["trials"] and record["wall_seconds"] > 0:
+                record["trials_per_second"] = record["trials"] / record["wall_seconds"]
+            stages.append(record)
+        return {
+            "stages": stages,
+            "total_wall_seconds": sum(record["wall_seconds"] for record in stages),
+            "total_cpu_seconds": sum(record["cpu_seconds"] or 0.0 for record in stages),
+        }
+
+    def to_prometheus(self):
+        metrics = (
+            ("wall_seconds", "channel_sim_stage_wall_seconds", "Настенное время этапа"),
+            ("cpu_seconds", "channel_sim_stage_cpu_seconds", "Процессорное время этапа"),
+            ("peak_allocated_bytes", "channel_sim_stage_peak_allocated_bytes", "Пик выделенной памяти"),
+            ("trials", "channel_sim_stage_trials_total", "Число смоделированных экспериментов"),
+        )
+        lines = []
+        for key, metric, description in metrics:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {'counter' if key == 'trials' else 'gauge'}")
+            for record in self.stages.values():
+                if record[key] is not None:
+                    lines.append(f'{metric}{{stage="{record["stage"]}"}} {record[key]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.write(self.to_prometheus())
+
+
+def profile_stage(profiler, name, trials=0, cpu="thread"):
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.stage(name, trials, cpu)
@@ -0,0 +1,405 @@
+# Локальный HTTP/JSON-сервис поверх asyncio из стандартной библиотеки:
+#
+#   python -m channel_sim.service --port 8765 --workers 4
+#
+#   GET  /health                              состояние, счётчики и кэш
+#   GET  /pmf?n=10&p=0.3                      P(η = k) и Fη(x)
+#   POST /simulate {"n":..,"p":..,"experiments":..,"seed":..}
+#                                             гистограмма mas_ni, характеристики и D;
+#                                             с "frequencies": true — как у CLI
+#   POST /statistics {"mas_ni":[..],"p":..}   характеристики и D по гистограмме
+#   GET  /stream?n=..&p=..&experiments=..     частичные гистограммы (NDJSON)
+#
+# Параметры принимаются и в строке запроса, и в теле JSON. Одновременные
+# запросы с одинаковыми (n, p) ждут одного расчёта теоретических таблиц,
+# а моделирование выполняется в пуле процессов, не блокируя цикл событий.
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from .accumulator import HISTOGRAM_DTYPE, StatisticsAccumulator
+from .adaptive import StoppingRule, batch_schedule
+from .cache import cached_binomial, theory_cache
+from .cli import result_to_json
+from .core import summarize_histogram
+from .engine import METHODS, _check_arguments
+from .models import BinomialModel
+from .parallel import simulate_share, split_experiments
+
+MAX_BODY = 16 * 1024 * 1024
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    414: "URI Too Long",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _integer(parameters, key, default=...):
+    value = parameters.get(key)
+    if value is None:
+        if default is ...:
+            raise ValueError(f"Не задан параметр {key}")
+        return default
+    return int(value)
+
+
+def _number(parameters, key, default=...):
+    value = parameters.get(key)
+    if value is None:
+        if default is ...:
+            raise ValueError(f"Не задан параметр {key}")
+        return default
+    return float(value)
+
+
+def _flag(parameters, key):
+    value = parameters.get(key, False)
+    if isinstance(value, str):
+        return value.lower() in TRUE_VALUES
+    return bool(value)
+
+
+async def _read_line(reader, status, message):
+    # StreamReader.readline выбрасывает ValueError для строки длиннее
+    # лимита буфера (64 КиБ)
+    try:
+        return await reader.readline()
+    except ValueError:
+        raise HTTPError(status, message) from None
+
+
+async def read_request(reader):
+    # (метод, путь с запросом, заголовки, тело) или None при закрытии соединения
+    line = await _read_line(reader, 414, "Слишком длинная строка запроса")
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Некорректная строка запроса") from None
+    headers = {}
+    while True:
+        line = await _read_line(reader, 431, "Слишком длинный заголовок")
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Некорректный заголовок Content-Length") from None
+    if length < 0:
+        raise HTTPError(400, "Некорректный заголовок Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(413, "Слишком большое тело запроса")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+async def write_json(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("ascii") + body)
+    await writer.drain()
+
+
+async def write_stream(writer, messages):
+    # Ответ без заранее известной длины: по строке JSON на фрагмент
+    writer.write(b"HTTP/1.1 200 OK\r\n"
+                 b"Content-Type: application/x-ndjson; charset=utf-8\r\n"
+                 b"Transfer-Encoding: chunked\r\n\r\n")
+    async for message in messages:
+        data = json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+        writer.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+class SimulationService:
+    def __init__(self, workers=None, executor=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor or ProcessPoolExecutor(max_workers=self.workers)
+        self.requests = 0
+        self.coalesced = 0
+        # Незавершённые расчёты теоретических таблиц по ключу (n, p)
+        self._theory = {}
+        self.routes = {
+            "/health": self.health,
+            "/pmf": self.pmf,
+            "/simulate": self.simulate,
+            "/statistics": self.statistics,
+        }
+        self.streams = {"/stream": self.stream}
+
+    async def theory(self, n, p):
+        # Таблицы берутся из кэша; если их ещё считают для другого
+        # запроса, ждём тот же расчёт, а не запускаем второй
+        key = (n, float(p))
+        future = self._theory.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(None, cached_binomial, n, p)
+            self._theory[key] = future
+            future.add_done_callback(lambda _: self._theory.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Отмена одного ожидающего не должна отменять расчёт для остальных
+        return await asyncio.shield(future)
+
+    async def simulate_histogram(self, n, p, experiments, seed_sequence, method="binomial", shares=1):
+        # Доли экспериментов и потоки SeedSequence.spawn — как в run_parallel,
+        # поэтому ответ совпадает с run_parallel(n, p, experiments, seed, shares)
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(self.executor, simulate_share, n, p, share, child, method)
+                   for share, child in zip(split_experiments(experiments, shares), seed_sequence.spawn(shares))]
+        accumulator = StatisticsAccumulator(n)
+        for part in await asyncio.gather(*futures):
+            accumulator.merge(part)
+        return accumulator
+
+    @staticmethod
+    def _arguments(parameters):
+        n = _integer(parameters, "n")
+        p = _number(parameters, "p")
+        experiments = _integer(parameters, "experiments")
+        method = parameters.get("method", "binomial")
+        _check_arguments(n, p, experiments, method)
+        return n, p, experiments, method
+
+    async def health(self, parameters):
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "methods": list(METHODS),
+            "cache": theory_cache.info(),
+        }
+
+    async def pmf(self, parameters):
+        n = _integer(parameters, "n")
+        p = _number(parameters, "p")
+        _check_arguments(n, p, 1, "binomial")
+        theoretical_probs, theoretical_cdf = await self.theory(n, p)
+        return {"n": n, "p": p, "pmf": theoretical_probs.tolist(), "cdf": theoretical_cdf.tolist()}
+
+    async def simulate(self, parameters):
+        n, p, experiments, method = self._arguments(parameters)
+        shares = _integer(parameters, "workers", 1)
+        # Больше частей, чем процессов пула, не ускоряет расчёт, а каждая
+        # часть — отдельная задача пула и отдельный поток SeedSequence
+        if not 0 < shares <= self.workers:
+            raise ValueError(f"Число частей должно быть от 1 до {self.workers}")
+        two_sided = _flag(parameters, "two_sided")
+        seed_sequence = np.random.SeedSequence(_integer(parameters, "seed", None))
+        (theoretical_probs, theoretical_cdf), accumulator = await asyncio.gather(
+            self.theory(n, p), self.simulate_histogram(n, p, experiments, seed_sequence, method, shares))
+        result = summarize_histogram(accumulator, p, theoretical_probs, two_sided, theoretical_cdf)
+        result["seed"] = seed_sequence.entropy
+        result["workers"] = shares
+        result["method"] = method
+        result["model"] = BinomialModel(n, p, method).describe()
+        if _flag(parameters, "frequencies"):
+            return result_to_json(result)
+        # Таблица частот в n + 1 строк выводится из mas_ni и при больших n
+        # во много раз длиннее самой гистограммы
+        return {
+            "parameters": {"n": n, "p": p, "experiments": experiments, "seed": result["seed"],
+                           "workers": shares, "method": method, "model": result["model"]},
+            "mas_ni": result["mas_ni"].tolist(),
+            "statistics": result["statistics"],
+            "D": result["D"],
+            "xn": result["xn"],
+            "p_value": result["p_value"],
+        }
+
+    async def statistics(self, parameters):
+        try:
+            mas_ni = np.asarray(parameters.get("mas_ni") or [], dtype=HISTOGRAM_DTYPE)
+        except OverflowError:
+            raise ValueError("Частоты гистограммы должны быть целыми от 0 до 2^64 - 1") from None
+        if mas_ni.size < 2 or not mas_ni.any():
+            raise ValueError("Гистограмма mas_ni должна содержать n + 1 неотрицательных значений")
+        p = _number(parameters, "p")
+        n = len(mas_ni) - 1
+        _check_arguments(n, p, 1, "binomial")
+        theoretical_probs, theoretical_cdf = await self.theory(n, p)
+        result = summarize_histogram(StatisticsAccumulator.from_histogram(mas_ni), p, theoretical_probs,
+                                     _flag(parameters, "two_sided"), theoretical_cdf)
+        return {key: result[key] for key in ("n", "p", "experiments", "statistics", "D", "xn", "p_value")}
+
+    async def stream(self, parameters):
+        # Пакеты растут геометрически, после каждого выдаётся частичная
+        # гистограмма; поток заканчивается при выполнении условий
+        # остановки (по умолчанию полоса ДКВ 0.01) или исчерпании experiments
+        n, p, max_experiments, method = self._arguments(parameters)
+        two_sided = _flag(parameters, "two_sided")
+        rule = StoppingRule(_number(parameters, "band", None), _number(parameters, "mean_tol", None),
+                            _number(parameters, "var_tol", None), _number(parameters, "confidence", 0.95))
+        initial_batch = _integer(parameters, "initial_batch", 1000)
+        if initial_batch <= 0:
+            raise ValueError("Начальный пакет должен быть > 0")
+        seed_sequence = np.random.SeedSequence(_integer(parameters, "seed", None))
+        theoretical_probs, theoretical_cdf = await self.theory(n, p)
+        moments = BinomialModel(n, p, method).moments()
+
+        async def messages():
+            accumulator = StatisticsAccumulator(n)
+            for size in batch_schedule(max_experiments, initial_batch, target=rule.required_experiments()):
+                part = await self.simulate_histogram(n, p, size, seed_sequence.spawn(1)[0], method)
+                accumulator.merge(part)
+                result = summarize_histogram(accumulator, p, theoretical_probs, two_sided, theoretical_cdf,
+                                             moments=moments)
+                converged = rule.is_met(result)
+                yield {
+                    "experiments": result["experiments"],
+                    "seed": seed_sequence.entropy,
+                    "D": result["D"],
+                    "xn": result["xn"],
+                    "p_value": result["p_value"],
+                    "dkw_epsilon": rule.dkw_epsilon(result["experiments"]),
+                    "statistics": result["statistics"],
+                    "converged": converged,
+                    "mas_ni": accumulator.histogram.tolist(),
+                }
+                if converged:
+                    return
+        return messages()
+
+    async def dispatch(self, method, target, body, writer, keep_alive):
+        url = urlsplit(target)
+        self.requests += 1
+        try:
+            if method not in ("GET", "POST"):
+                raise HTTPError(405, f"Метод {method} не поддерживается")
+            handler = self.routes.get(url.path) or self.streams.get(url.path)
+            if handler is None:
+                raise HTTPError(404, f"Неизвестный путь {url.path}")
+            parameters = dict(parse_qsl(url.query))
+            if body:
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    raise HTTPError(400, "Тело запроса должно быть объектом JSON") from None
+                if not isinstance(payload, dict):
+                    raise HTTPError(400, "Тело запроса должно быть объектом JSON")
+                parameters.update(payload)
+            response = await handler(parameters)
+        except HTTPError as error:
+            await write_json(writer, error.status, {"error": str(error)}, keep_alive)
+            return
+        except (TypeError, ValueError, OverflowError) as error:
+            await write_json(writer, 400, {"error": str(error)}, keep_alive)
+            return
+        except Exception as error:
+            await write_json(writer, 500, {"error": repr(error)}, keep_alive)
+            return
+
+        if url.path in self.streams:
+            try:
+                await write_stream(writer, response)
+            except ConnectionError:
+                raise
+            except Exception as error:
+                # Заголовки уже отправлены: ошибка передаётся последней строкой,
+                # а соединение закрывается
+                data = json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8") + b"\n"
+                writer.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n0\r\n\r\n")
+                raise ConnectionError from error
+        else:
+            await write_json(writer, 200, response, keep_alive)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as error:
+                    await write_json(writer, error.status, {"error": str(error)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self.dispatch(method, target, body, writer, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+async def serve(host="127.0.0.1", port=8765, workers=None):
+    service = SimulationService(workers)
+    try:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        address = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+        print(f"Сервис запущен на {address}, процессов: {service.workers}", file=sys.stderr, flush=True)
+        # По SIGTERM сервис завершается так же, как по Ctrl+C, закрывая пул
+        # процессов (в Windows обработчики сигналов asyncio недоступны)
+        stop = asyncio.Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                asyncio.get_running_loop().add_signal_handler(signal_number, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        async with server:
+            await stop.wait()
+    finally:
+        service.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="channel_sim.service",
+                                     description="HTTP/JSON-сервис моделирования канала")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=0, help="число процессов; 0 — по числу ядер")
+    parser.add_argument("--cache-dir", default=None,
+                        help="каталог для файлов .npy с теоретическими таблицами")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.cache_dir:
+        theory_cache.configure(directory=args.cache_dir)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers or None))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
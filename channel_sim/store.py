@@ -0,0 +1,184 @@
+# Хранилище выполненных расчётов: гистограмма mas_ni каждого прогона
+# лежит в отдельном файле .npy и открывается через отображение в память,
+# а параметры, зерна, характеристики и D/xn — в небольшом индексе index.json.
+# Повторное открытие прогона не требует моделирования: по гистограмме
+# заново строятся только характеристики и функции распределения.
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from .accumulator import HISTOGRAM_DTYPE, StatisticsAccumulator
+from .cache import cached_model
+from .core import describe_model, run_model, summarize_histogram
+from .models import create_model
+
+INDEX_NAME = "index.json"
+
+
+class RunStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def _histogram_path(self, entry):
+        return os.path.join(self.directory, entry["histogram"])
+
+    def _read_index(self):
+        try:
+            with open(self._index_path(), encoding="utf-8") as stream:
+                return json.load(stream)
+        except FileNotFoundError:
+            return {}
+
+    def _replace(self, path, write):
+        # Запись во временный файл и переименование: читатель видит либо
+        # старую, либо новую версию целиком
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as stream:
+                write(stream)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def _write_index(self, index):
+        text = json.dumps(index, ensure_ascii=False, indent=1).encode("utf-8")
+        self._replace(self._index_path(), lambda stream: stream.write(text))
+
+    def _write_histogram(self, entry, mas_ni):
+        # Каждая версия гистограммы пишется в новый файл: старый может быть
+        # ещё отображён в память, а в Windows такой файл нельзя заменить
+        version = entry.get("version", -1) + 1
+        entry["version"] = version
+        entry["histogram"] = f"{entry['id']}_{version}_mas_ni.npy"
+        mas_ni = np.asarray(mas_ni, dtype=HISTOGRAM_DTYPE)
+        self._replace(self._histogram_path(entry), lambda stream: np.save(stream, mas_ni))
+
+    def _remove_file(self, name):
+        try:
+            os.unlink(os.path.join(self.directory, name))
+        except OSError:
+            # Файл ещё открыт или уже удалён; при следующих запусках он
+            # не используется
+            pass
+
+    @staticmethod
+    def _summary(result):
+        return {
+            "experiments": int(result["experiments"]),
+            "statistics": {name: float(value) for name, value in result["statistics"].items()},
+            "D": float(result["D"]),
+            "xn": int(result["xn"]),
+            "p_value": None if result["p_value"] is None else float(result["p_value"]),
+        }
+
+    def save(self, result, two_sided=False):
+        # Возвращает идентификатор нового прогона
+        if "model" not in result:
+            raise ValueError("В результате не указана модель канала")
+        run_id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        now = time.time()
+        entry = {
+            "id": run_id,
+            "created": now,
+            "updated": now,
+            "model": result["model"],
+            "two_sided": two_sided,
+            # Зерна и числа параллельных частей всех частей прогона
+            # по порядку дозаписи
+            "seeds": [result.get("seed")],
+            "workers": [result.get("workers")],
+            **self._summary(result),
+        }
+        with self._lock:
+            self._write_histogram(entry, result["mas_ni"])
+            index = self._read_index()
+            index[run_id] = entry
+            self._write_index(index)
+        return run_id
+
+    def runs(self):
+        # Записи индекса, начиная с самых новых
+        return sorted(self._read_index().values(), key=lambda entry: entry["created"], reverse=True)
+
+    def entry(self, run_id):
+        index = self._read_index()
+        if run_id not in index:
+            raise ValueError(f"Прогон {run_id} не найден")
+        return index[run_id]
+
+    @staticmethod
+    def model(entry):
+        description = dict(entry["model"])
+        return create_model(description.pop("model"), **description)
+
+    def histogram(self, run_id):
+        return np.load(self._histogram_path(self.entry(run_id)), mmap_mode="r")
+
+    def _result(self, entry, mas_ni):
+        model = self.model(entry)
+        theoretical_probs, theoretical_cdf = cached_model(model)
+        result = summarize_histogram(StatisticsAccumulator.from_histogram(mas_ni),
+                                     getattr(model, "p", None), theoretical_probs, entry["two_sided"],
+                                     theoretical_cdf, moments=model.moments())
+        result["seed"] = entry["seeds"][0]
+        # Прогоны, сохранённые до появления поля, числа частей не содержат
+        result["workers"] = entry.get("workers", [None])[0]
+        describe_model(result, model)
+        result["run_id"] = entry["id"]
+        return result
+
+    def load(self, run_id):
+        entry = self.entry(run_id)
+        return self._result(entry, np.load(self._histogram_path(entry), mmap_mode="r"))
+
+    def append(self, run_id, result):
+        # Добавляет к прогону эксперименты из result той же модели,
+        # складывая гистограммы
+        with self._lock:
+            index = self._read_index()
+            if run_id not in index:
+                raise ValueError(f"Прогон {run_id} не найден")
+            entry = index[run_id]
+            if self.model(entry).key() != self.model(result).key():
+                raise ValueError("Модель дозаписываемого результата не совпадает с моделью прогона")
+            previous = entry["histogram"]
+            stored = np.load(self._histogram_path(entry), mmap_mode="r")
+            # Прогоны, записанные со знаковым типом, приводятся к HISTOGRAM_DTYPE
+            merged = stored.astype(HISTOGRAM_DTYPE) + np.asarray(result["mas_ni"], dtype=HISTOGRAM_DTYPE)
+            self._write_histogram(entry, merged)
+            merged_result = self._result(entry, merged)
+            entry.update(self._summary(merged_result), updated=time.time())
+            entry["seeds"].append(result.get("seed"))
+            entry.setdefault("workers", [None] * (len(entry["seeds"]) - 1)).append(result.get("workers"))
+            self._write_index(index)
+            self._remove_file(previous)
+        return merged_result
+
+    def extend(self, run_id, experiments, seed=None, profiler=None):
+        # Моделирует ещё experiments экспериментов и дозаписывает их.
+        # Без зерна берётся случайное и сохраняется в индексе
+        entry = self.entry(run_id)
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        result = run_model(self.model(entry), experiments, seed, entry["two_sided"], profiler)
+        return self.append(run_id, result)
+
+    def delete(self, run_id):
+        with self._lock:
+            index = self._read_index()
+            entry = index.pop(run_id, None)
+            if entry is None:
+                raise ValueError(f"Прогон {run_id} не найден")
+            self._write_index(index)
+            self._remove_file(entry["histogram"])
@@ -0,0 +1,165 @@
+# Перебор сетки параметров (n, p, число экспериментов) с сохранением
+# одной таблицы результатов:
+# python -m channel_sim.sweep --n 10,100 --p 0.1:0.5:0.1 --experiments 1000,100000 -o sweep.csv
+import argparse
+import csv
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import summarize_histogram
+from .engine import METHODS, _check_arguments
+from .parallel import _child_generator, simulate_share
+from .accumulator import StatisticsAccumulator
+from .adaptive import StoppingRule, iter_adaptive
+from .cache import cached_binomial, theory_cache
+
+RESULT_COLUMNS = ("n", "p", "experiments", "Eη", "Dη", "x̄", "S^2", "Me", "R",
+                  "|Eη - x̄|", "|Dη - S^2|", "D", "xn", "p_value")
+
+
+def parse_values(text, kind):
+    # «10,20,50» — список, «0.1:0.5:0.1» — диапазон с шагом, включая конец
+    values = []
+    for part in text.split(","):
+        part = part.strip()
+        if ":" in part:
+            start, stop, step = (kind(x) for x in part.split(":"))
+            if step <= 0:
+                raise ValueError(f"Шаг диапазона должен быть > 0: {part}")
+            count = int(round((stop - start) / step)) + 1
+            values.extend(kind(round(start + i * step, 12)) for i in range(count))
+        elif part:
+            values.append(kind(part))
+    return values
+
+
+def parameter_grid(ns, ps, experiment_counts):
+    return list(itertools.product(ns, ps, experiment_counts))
+
+
+def result_row(result):
+    statistics = result["statistics"]
+    row = {"n": result["n"], "p": result["p"], "experiments": result["experiments"]}
+    row.update(statistics)
+    row["|Eη - x̄|"] = abs(statistics["Eη"] - statistics["x̄"])
+    row["|Dη - S^2|"] = abs(statistics["Dη"] - statistics["S^2"])
+    row["D"] = result["D"]
+    row["xn"] = result["xn"]
+    row["p_value"] = result["p_value"]
+    return row
+
+
+def adaptive_share(n, p, max_experiments, seed_sequence, method, rule):
+    rng = _child_generator(seed_sequence, method)
+    for result, converged in iter_adaptive(n, p, max_experiments, rule, rng, method):
+        pass
+    return StatisticsAccumulator.from_histogram(result["mas_ni"]), converged
+
+
+def run_sweep(ns, ps, experiment_counts, seed=None, workers=None, method="binomial",
+              two_sided=False, rule=None):
+    # При заданном правиле остановки каждая точка моделируется адаптивно,
+    # а значения experiments служат бюджетом
+    grid = parameter_grid(ns, ps, experiment_counts)
+    for n, p, experiments in grid:
+        _check_arguments(n, p, experiments, method)
+    children = np.random.SeedSequence(seed).spawn(len(grid))
+
+    # Теоретическое распределение берётся из кэша: для каждой пары (n, p)
+    # оно вычисляется один раз, сколько бы ни было значений числа экспериментов
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        if rule is None:
+            futures = [executor.submit(simulate_share, n, p, experiments, child, method)
+                       for (n, p, experiments), child in zip(grid, children)]
+        else:
+            futures = [executor.submit(adaptive_share, n, p, experiments, child, method, rule)
+                       for (n, p, experiments), child in zip(grid, children)]
+        for (n, p, experiments), future in zip(grid, futures):
+            if rule is None:
+                accumulator = future.result()
+            else:
+                accumulator, converged = future.result()
+            theoretical_probs, theoretical_cdf = cached_binomial(n, p)
+            result = summarize_histogram(accumulator, p, theoretical_probs, two_sided,
+                                         theoretical_cdf)
+            row = result_row(result)
+            if rule is not None:
+                row["max_experiments"] = experiments
+                row["converged"] = converged
+            rows.append(row)
+    return rows
+
+
+def write_rows(rows, path):
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Для записи Parquet требуется пакет pyarrow") from None
+        table = pyarrow.Table.from_pylist(rows)
+        pyarrow.parquet.write_table(table, path)
+        return
+
+    if path == "-":
+        _write_csv(rows, sys.stdout)
+        return
+    with open(path, "w", newline="", encoding="utf-8") as stream:
+        _write_csv(rows, stream)
+
+
+def _write_csv(rows, stream):
+    fieldnames = list(rows[0]) if rows else RESULT_COLUMNS
+    writer = csv.DictWriter(stream, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="channel_sim.sweep",
+                                     description="Перебор сетки параметров моделирования")
+    parser.add_argument("--n", required=True, help="список или диапазон start:stop:step")
+    parser.add_argument("--p", required=True, help="список или диапазон start:stop:step")
+    parser.add_argument("--experiments", required=True, help="список или диапазон start:stop:step")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--method", choices=METHODS, default="binomial")
+    parser.add_argument("--two-sided", action="store_true")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="адаптивный режим: experiments задаёт бюджет каждой точки")
+    parser.add_argument("--band", type=float, default=None)
+    parser.add_argument("--mean-tol", type=float, default=None)
+    parser.add_argument("--var-tol", type=float, default=None)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--cache-dir", default=None,
+                        help="каталог для файлов .npy с теоретическими таблицами")
+    parser.add_argument("-o", "--output", default="-",
+                        help="файл .csv или .parquet; по умолчанию CSV в stdout")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.cache_dir:
+        theory_cache.configure(directory=args.cache_dir)
+    try:
+        rule = None
+        if args.adaptive:
+            rule = StoppingRule(args.band, args.mean_tol, args.var_tol, args.confidence)
+        rows = run_sweep(parse_values(args.n, int), parse_values(args.p, float),
+                         parse_values(args.experiments, int), args.seed, args.workers,
+                         args.method, args.two_sided, rule)
+        write_rows(rows, args.output)
+    except (ValueError, RuntimeError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# Теоретическое биномиальное распределение за O(n) в логарифмах:
+# без факториалов, переполнения C(n, k) и обнуления p ** k.
+import math
+
+import numpy as np
+
+
+def _check_arguments(n, p):
+    if n < 0 or not (0 <= p <= 1):
+        raise ValueError("Некорректные данные")
+
+
+def _log_pmf_range(n, p, lo, hi):
+    # ln P(η = k) для k из [lo, hi] через рекуррентное отношение
+    # P(k+1) / P(k) = (n - k) / (k + 1) * p / (1 - p),
+    # привязанное к моде, где значение вычисляется через lgamma
+    k = np.arange(lo, hi + 1, dtype=np.float64)
+    mode = min(max(int((n + 1) * p), lo), hi)
+    anchor = (math.lgamma(n + 1) - math.lgamma(mode + 1) - math.lgamma(n - mode + 1)
+              + mode * math.log(p) + (n - mode) * math.log1p(-p))
+
+    log_ratio = np.log(n - k[:-1]) - np.log(k[:-1] + 1) + (math.log(p) - math.log1p(-p))
+    log_pmf = np.empty_like(k)
+    i = mode - lo
+    log_pmf[i] = anchor
+    log_pmf[i + 1:] = anchor + np.cumsum(log_ratio[i:])
+    log_pmf[:i] = anchor - np.cumsum(log_ratio[:i][::-1])[::-1]
+    return log_pmf
+
+
+def mode_window(n, p, tol):
+    # Границы [lo, hi], вне которых по неравенству Хёфдинга лежит
+    # вероятность не больше tol
+    _check_arguments(n, p)
+    if not (0 < tol < 1):
+        raise ValueError("Допуск tol должен быть в (0, 1)")
+    half_width = math.sqrt(n * math.log(2 / tol) / 2)
+    lo = max(0, math.floor(n * p - half_width))
+    hi = min(n, math.ceil(n * p + half_width))
+    return lo, hi
+
+
+def binomial_pmf_window(n, p, lo, hi):
+    _check_arguments(n, p)
+    if p == 0 or p == 1:
+        pmf = np.zeros(hi - lo + 1)
+        k = 0 if p == 0 else n
+        if lo <= k <= hi:
+            pmf[k - lo] = 1.0
+        return pmf
+    return np.exp(_log_pmf_range(n, p, lo, hi))
+
+
+def binomial_pmf(n, p, tol=None):
+    # Массив P(η = k), k = 0..n; при заданном tol вычисляются только
+    # значения в окне вокруг моды, остальные считаются нулевыми
+    lo, hi = (0, n) if tol is None else mode_window(n, p, tol)
+    pmf = np.zeros(n + 1)
+    pmf[lo:hi + 1] = binomial_pmf_window(n, p, lo, hi)
+    return pmf
+
+
+def binomial_cdf(n, p, tol=None):
+    return pmf_to_cdf(binomial_pmf(n, p, tol))
+
+
+def pmf_to_cdf(pmf):
+    return np.minimum(np.cumsum(pmf), 1.0)
@@ -0,0 +1,122 @@
+# Фоновый поток моделирования для графического интерфейса. Результаты
+# передаются через очередь сообщений, которую интерфейс опрашивает сам
+# (например, через root.after), поэтому Tk здесь не используется.
+import queue
+import threading
+import time
+
+from .accumulator import StatisticsAccumulator
+from .adaptive import iter_adaptive
+from .cache import cached_model
+from .core import SampleExport, describe_model, profiled_batches, summarize_histogram
+from .models import BinomialModel
+from .profiling import profile_stage
+
+# Виды сообщений в очереди: (вид, данные)
+PROGRESS = "progress"
+DONE = "done"
+CANCELLED = "cancelled"
+ERROR = "error"
+
+
+class SimulationWorker(threading.Thread):
+    def __init__(self, n, p, experiments, seed=None, method="binomial", two_sided=False,
+                 update_interval=0.5, profiler=None, rule=None, model=None, samples_path=None):
+        super().__init__(daemon=True)
+        if rule is not None and samples_path:
+            raise ValueError("Выгрузка исходов недоступна в адаптивном режиме")
+        # n, p и method задают биномиальную модель, если не передана другая
+        self.model = model or BinomialModel(n, p, method)
+        self.n = self.model.support_max
+        self.p = getattr(self.model, "p", None)
+        self.experiments = experiments
+        self.seed = seed
+        self.method = method
+        self.two_sided = two_sided
+        self.update_interval = update_interval
+        self.profiler = profiler
+        # При заданном правиле остановки experiments — максимальный бюджет
+        self.rule = rule
+        # Файл .npy для исходов отдельных экспериментов, если их нужно выгрузить
+        self.samples_path = samples_path
+        self.messages = queue.Queue()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _summary(self, accumulator, theoretical_probs, theoretical_cdf, profiler=None):
+        result = summarize_histogram(accumulator, self.p, theoretical_probs, self.two_sided,
+                                     theoretical_cdf, profiler, self.model.moments())
+        result["seed"] = self.seed
+        describe_model(result, self.model)
+        result["progress"] = accumulator.count / self.experiments
+        return result
+
+    def _run_adaptive(self):
+        last_update = time.monotonic()
+        rounds = iter_adaptive(self.n, self.p, self.experiments, self.rule, self.seed, self.method,
+                               self.two_sided, profiler=self.profiler, model=self.model)
+        for result, converged in rounds:
+            if self.cancelled:
+                self.messages.put((CANCELLED, result["experiments"]))
+                return
+            result["seed"] = self.seed
+            describe_model(result, self.model)
+            result["converged"] = converged
+            result["progress"] = result["experiments"] / self.experiments
+            now = time.monotonic()
+            if now - last_update >= self.update_interval:
+                snapshot = dict(result, mas_ni=result["mas_ni"].copy())
+                self.messages.put((PROGRESS, snapshot))
+                last_update = now
+        self.messages.put((DONE, result))
+
+    def run(self):
+        if self.rule is not None:
+            try:
+                self._run_adaptive()
+            except Exception as error:
+                self.messages.put((ERROR, error))
+            return
+        try:
+            profiler = self.profiler
+            with profile_stage(profiler, "pmf"):
+                theoretical_probs, theoretical_cdf = cached_model(self.model)
+            accumulator = StatisticsAccumulator(self.n)
+            last_update = time.monotonic()
+            export = None
+            if self.samples_path:
+                export = SampleExport(self.samples_path, self.experiments, self.n)
+            batches = self.model.batches(self.experiments, self.seed)
+            try:
+                for counts in profiled_batches(batches, profiler):
+                    if self.cancelled:
+                        self.messages.put((CANCELLED, accumulator.count))
+                        return
+                    if export is not None:
+                        with profile_stage(profiler, "export"):
+                            export.write(counts)
+                    with profile_stage(profiler, "statistics"):
+                        accumulator.add(counts)
+                    now = time.monotonic()
+                    if now - last_update >= self.update_interval and accumulator.count < self.experiments:
+                        # Промежуточный результат строится по копии гистограммы,
+                        # которую поток дальше не изменяет
+                        with profile_stage(profiler, "progress_updates"):
+                            snapshot = self._summary(accumulator.copy(), theoretical_probs, theoretical_cdf)
+                        self.messages.put((PROGRESS, snapshot))
+                        last_update = now
+            finally:
+                if export is not None:
+                    export.close()
+            result = self._summary(accumulator, theoretical_probs, theoretical_cdf, profiler)
+            if self.samples_path:
+                result["samples_path"] = self.samples_path
+            self.messages.put((DONE, result))
+        except Exception as error:
+            self.messages.put((ERROR, error))
@@ -1,76 +1,88 @@
+import os
+import queue
 import tkinter as tk
-from tkinter import ttk, messagebox
-import random
-import matplotlib.pyplot as plt
+from tkinter import ttk, messagebox, filedialog
+import numpy as np
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-def factorial(n): 
-    if n == 0 or n == 1:
-        return 1
-    result = 1
-    for i in range(2, n + 1):
-        result *= i
-    return result
-
-def binomial_coefficient(n, k): 
-    return factorial(n) // (factorial(k) * factorial(n - k))
-
-def theoretical_binomial_probabilities_manual(n, p): 
-    probabilities = []
-    for k in range(n + 1):
-        prob = binomial_coefficient(n, k) * (p ** k) * ((1 - p) ** (n - k))
-        probabilities.append(prob)
-    return probabilities
-
-def calculate_statistics_manual(data, n, p): 
-    expected_value = n * p
-    variance = n * p * (1 - p)
-
-    sample_sum = sum(data)
-    sample_mean = sample_sum / len(data)
-    sample_variance = sum((x - sample_mean) ** 2 for x in data) / len(data)
-    sample_median = (sorted(data)[len(data) // 2 - 1] + sorted(data)[len(data) // 2]) / 2 if len(data) % 2 == 0 else sorted(data)[len(data) // 2]
-    sample_range = max(data) - min(data)
-
-    return {
-        "Eη": expected_value,  
-        "Dη": variance,        
-        "x̄": sample_mean,      
-        "S^2": sample_variance,
-        "Me": sample_median,    
-        "R": sample_range,      
-    }
-
-def plot_distribution_functions_manual(data, theoretical_probs, n): 
-    theoretical_cdf = []
-    cumulative = 0
-    for prob in theoretical_probs:
-        cumulative += prob
-        theoretical_cdf.append(cumulative)
-
-    sorted_data = sorted(data)
-    sample_cdf = []
-    for value in range(n + 1):
-        count = sum(1 for x in sorted_data if x <= value)
-        sample_cdf.append(count / len(data))
-
-    # Вычисление меры расхождения
-    max_diff = 0
-    xn = 0
-    for i in range(n + 1):
-        if (theoretical_cdf[i] - sample_cdf[i]) > max_diff:
-            max_diff = (theoretical_cdf[i] - sample_cdf[i])
-            xn = i
-    figure = plt.Figure(figsize=(6, 4), dpi=100)
-    ax = figure.add_subplot(111)
-    ax.step(range(n + 1), theoretical_cdf, label="Теоретическая Fη(x)", where="post")
-    ax.step(range(n + 1), sample_cdf, label="Выборочная F̂η(x)", where="post", linestyle="--")
-    ax.set_xlabel("x")
-    ax.set_ylabel("F(x)")
+from channel_sim import (MODELS, RunStore, SimulationWorker, StageProfiler, StoppingRule, cdf_plot_data,
+                         create_model, profile_stage)
+from channel_sim.worker import PROGRESS, DONE, CANCELLED, ERROR
+
+# Сколько строк таблицы материализуется одновременно
+PAGE_SIZE = 200
+# Каталог сохранённых прогонов
+RUN_STORE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".channel_sim", "runs")
+
+
+class PagedTable:
+    # Постраничная таблица: в Treeview существуют только строки текущей
+    # страницы, а при новом результате их значения меняются на месте
+    def __init__(self, tree, parent):
+        self.tree = tree
+        self.items = []
+        self.page = 0
+        self.total = 0
+        self.row_values = None
+
+        nav_frame = ttk.Frame(parent)
+        nav_frame.pack(fill='x')
+        self.btn_prev = ttk.Button(nav_frame, text="◀", width=3, command=lambda: self.show_page(self.page - 1))
+        self.btn_prev.pack(side=tk.LEFT)
+        self.page_label = ttk.Label(nav_frame, text="")
+        self.page_label.pack(side=tk.LEFT, expand=True)
+        self.btn_next = ttk.Button(nav_frame, text="▶", width=3, command=lambda: self.show_page(self.page + 1))
+        self.btn_next.pack(side=tk.RIGHT)
+
+    def set_rows(self, total, row_values):
+        self.total = total
+        self.row_values = row_values
+        self.show_page(self.page)
+
+    def show_page(self, page):
+        pages = max(1, -(-self.total // PAGE_SIZE))
+        self.page = min(max(page, 0), pages - 1)
+        start = self.page * PAGE_SIZE
+        stop = min(self.total, start + PAGE_SIZE)
+
+        # Добавляем или удаляем только недостающие / лишние строки
+        count = stop - start
+        while len(self.items) < count:
+            self.items.append(self.tree.insert('', 'end'))
+        if len(self.items) > count:
+            self.tree.delete(*self.items[count:])
+            del self.items[count:]
+
+        for item, i in zip(self.items, range(start, stop)):
+            self.tree.item(item, values=self.row_values(i))
+
+        self.page_label.config(text=f"Строки {start}–{max(start, stop - 1)} из {self.total}")
+        self.btn_prev.config(state=tk.NORMAL if self.page > 0 else tk.DISABLED)
+        self.btn_next.config(state=tk.NORMAL if self.page < pages - 1 else tk.DISABLED)
+
+
+def update_distribution_plot(result, immediate=False): 
+    # Линии графика создаются один раз, дальше меняются только их данные.
+    # Рисуется только область, где функции заметно отличаются от 0 и 1,
+    # и не больше нескольких тысяч точек при любом n
+    xn = result["xn"] if result["D"] > 0 else None
+    x, theoretical, sample = cdf_plot_data(result["theoretical_cdf"], result["sample_cdf"], xn)
+    theoretical_line.set_data(x, theoretical)
+    sample_line.set_data(x, sample)
+    # Отрезок, на котором достигается мера расхождения D
+    if xn is None:
+        gap_line.set_data([], [])
+        gap_line.set_label("_D")
+    else:
+        gap_line.set_data([xn, xn], [result["theoretical_cdf"][xn], result["sample_cdf"][xn]])
+        gap_line.set_label(f"D = {result['D']:.4f} при x = {xn}")
     ax.legend()
-    ax.set_title("Функции распределения")
-    ax.grid()
-    return figure,max_diff,xn
+    ax.relim()
+    ax.autoscale_view()
+    if immediate:
+        canvas.draw()
+    else:
+        canvas.draw_idle()
 
 # Функция для обновления текста меры расхождения
 def update_divergence_label(max_diff, xn):
@@ -78,7 +90,7 @@ def update_divergence_label(max_diff, xn):
 
 def display_frequencies(mas_ni, mas_n, theoretical_probs, n, max_diff, xm):
     # Проверяем, существует ли уже таблица частот
-    global stats_tree_2
+    global stats_tree_2, frequencies_table
     if 'stats_tree_2' not in globals():
         freq_frame = ttk.Frame(table_frame)
         freq_frame.pack(side=tk.LEFT, fill='both', expand=True)
@@ -100,91 +112,325 @@ def display_frequencies(mas_ni, mas_n, theoretical_probs, n, max_diff, xm):
         stats_tree_2.column('abs_diff', anchor='w', width=100)
 
         stats_tree_2.pack(fill='both', expand=True)
+        frequencies_table = PagedTable(stats_tree_2, freq_frame)
 
         global divergence_label_2
         divergence_label_2 = ttk.Label(freq_frame, text="", font=("Helvetica", 10), justify="center")
         divergence_label_2.pack(pady=5)
 
-    # Очищаем существующую таблицу
-    stats_tree_2.delete(*stats_tree_2.get_children())
-
-    # Заполняем таблицу новыми данными
-    for i in range(n + 1):
+    def row_values(i):
         relative_freq = mas_n[i]
         abs_diff = abs(relative_freq - theoretical_probs[i])
-        stats_tree_2.insert('', 'end', values=(
-            i, f"{theoretical_probs[i]:.4f}", mas_ni[i], f"{relative_freq:.4f}", f"{abs_diff:.4f}"
-        ))
+        return (i, f"{theoretical_probs[i]:.4f}", mas_ni[i], f"{relative_freq:.4f}", f"{abs_diff:.4f}")
+
+    frequencies_table.set_rows(n + 1, row_values)
 
     # Обновляем текст меры расхождения
     divergence_label_2.config(text=f"Мера расхождения D: {max_diff:.4f} при x = {xm}")
 
 
-def run_experiment():
-    try:
-        n = int(entry_n.get())
-        p = float(entry_p.get())
-        experiments = int(entry_experiments.get())
-
-        if n <= 0 or not (0 <= p <= 1) or experiments <= 0:
-            raise ValueError("Некорректные данные")
-
-        mas_ni = [0] * (n + 1)
-        mas_n = [0] * (n + 1)
-        data = []
-
-        for _ in range(experiments):
-            distorted_count = 0
-            for _ in range(n): 
-                if random.random() < p:
-                    distorted_count += 1 
-            mas_ni[distorted_count] += 1 
-            data.append(distorted_count)
-
-        for i in range(len(mas_ni)): 
-            mas_n[i] = mas_ni[i] / experiments 
-
-        for i in tree.get_children():
-            tree.delete(i)
-
-        for i in range(len(mas_ni)):
-            tree.insert('', 'end', values=(f"{i}", mas_ni[i], f"{mas_n[i]:.4f}"))
-
-        theoretical_probs = theoretical_binomial_probabilities_manual(n, p)
-        figure, max_diff, xn = plot_distribution_functions_manual(data, theoretical_probs, n)
-
-        statistics = calculate_statistics_manual(data, n, p)
-
-        # Update statistics table
-        stats_tree.delete(*stats_tree.get_children())
-        stats_tree.insert('', 'end', values=('Eη (мат. ожидание)', f"{statistics['Eη']:.4f}"))
-        stats_tree.insert('', 'end', values=('x̄ (среднее)', f"{statistics['x̄']:.4f}"))
-        stats_tree.insert('', 'end', values=('Eη - x̄ ', f"{abs(statistics['Eη'] - statistics['x̄']):.4f}"))
-        stats_tree.insert('', 'end', values=('Dη (дисперсия)', f"{statistics['Dη']:.4f}"))
-        stats_tree.insert('', 'end', values=('S^2 (выборочная дисперсия)', f"{statistics['S^2']:.4f}"))
-        stats_tree.insert('', 'end', values=('Dη - S^2', f"{abs(statistics['Dη'] - statistics['S^2']):.4f}"))
-        stats_tree.insert('', 'end', values=('Me (медиана)', f"{statistics['Me']:.4f}"))
-        stats_tree.insert('', 'end', values=('R (размах)', f"{statistics['R']:.4f}"))
-
-        update_divergence_label(max_diff, xn)
-
-        # Update frequencies and deviations table
-        display_frequencies(mas_ni, mas_n, theoretical_probs, n, max_diff, xn)
-
-        # Display graph
-        for widget in plot_frame.winfo_children():
-            widget.destroy()
-
-        canvas = FigureCanvasTkAgg(figure, master=plot_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+def display_result(result, profiler=None):
+    with profile_stage(profiler, "treeview"):
+        display_tables(result)
+
+    # При замере время отрисовки учитывается сразу, а не в отложенном draw_idle
+    with profile_stage(profiler, "canvas"):
+        update_distribution_plot(result, immediate=profiler is not None)
+
+
+def display_tables(result):
+    mas_ni = result["mas_ni"]
+    # Граница гистограммы; у моделей без параметра n result["n"] не задан
+    n = len(mas_ni) - 1
+    mas_n = result["mas_n"]
+    theoretical_probs = result["theoretical_probs"]
+    statistics = result["statistics"]
+    max_diff = result["D"]
+    xn = result["xn"]
+
+    values_table.set_rows(n + 1, lambda i: (f"{i}", mas_ni[i], f"{mas_n[i]:.4f}"))
+
+    # Update statistics table
+    rows = (
+        ('Eη (мат. ожидание)', f"{statistics['Eη']:.4f}"),
+        ('x̄ (среднее)', f"{statistics['x̄']:.4f}"),
+        ('Eη - x̄ ', f"{abs(statistics['Eη'] - statistics['x̄']):.4f}"),
+        ('Dη (дисперсия)', f"{statistics['Dη']:.4f}"),
+        ('S^2 (выборочная дисперсия)', f"{statistics['S^2']:.4f}"),
+        ('Dη - S^2', f"{abs(statistics['Dη'] - statistics['S^2']):.4f}"),
+        ('Me (медиана)', f"{statistics['Me']:.4f}"),
+        ('R (размах)', f"{statistics['R']:.4f}"),
+    )
+    for item, values in zip(stats_items, rows):
+        stats_tree.item(item, values=values)
+
+    update_divergence_label(max_diff, xn)
+
+    # Update frequencies and deviations table
+    display_frequencies(mas_ni, mas_n, theoretical_probs, n, max_diff, xn)
+
+
+def display_profile(report):
+    profile_tree.delete(*profile_tree.get_children())
+    for record in report["stages"]:
+        rate = record.get("trials_per_second")
+        profile_tree.insert('', 'end', values=(
+            record["stage"],
+            f"{record['wall_seconds'] * 1000:.1f}",
+            f"{record['cpu_seconds'] * 1000:.1f}" if record["cpu_seconds"] is not None else "",
+            f"{record['peak_allocated_bytes'] / 2 ** 20:.2f}",
+            f"{rate:,.0f}" if rate else "",
+        ))
+    profile_tree.insert('', 'end', values=(
+        "итого", f"{report['total_wall_seconds'] * 1000:.1f}", f"{report['total_cpu_seconds'] * 1000:.1f}", "", ""))
+
+
+def toggle_profile_panel():
+    if profile_frame.winfo_ismapped():
+        profile_frame.pack_forget()
+        btn_profile.config(text="Профилирование ▸")
+    else:
+        profile_frame.pack(fill='x', before=results_frame)
+        btn_profile.config(text="Профилирование ▾")
+
+
+def set_running(running):
+    btn_run.config(state=tk.DISABLED if running else tk.NORMAL)
+    btn_cancel.config(state=tk.NORMAL if running else tk.DISABLED)
+
+
+def poll_worker():
+    # Забираем сообщения фонового потока; из промежуточных результатов
+    # отображается только самый свежий
+    global worker, last_result, append_run_id
+    latest = None
+    while True:
+        try:
+            kind, payload = worker.messages.get_nowait()
+        except queue.Empty:
+            break
+        if kind == PROGRESS:
+            latest = payload
+            continue
+        worker = None
+        set_running(False)
+        if kind == DONE and append_run_id is not None:
+            # Дозапись: показываем объединённый сохранённый прогон
+            try:
+                payload = run_store.append(append_run_id, payload)
+            except (OSError, ValueError) as error:
+                kind, payload = ERROR, error
+            append_run_id = None
+        if kind == DONE:
+            progress_var.set(100)
+            last_result = payload
+            display_result(payload, worker_profiler)
+            display_profile(worker_profiler.report())
+            if "run_id" in payload:
+                progress_label.config(text=f"Прогон {payload['run_id']}: {payload['experiments']} экспериментов")
+            if "samples_path" in payload:
+                progress_label.config(text=f"Исходы выгружены в {payload['samples_path']}")
+            if "converged" in payload:
+                status = "Сошлось" if payload["converged"] else "Не сошлось"
+                progress_label.config(text=f"{status} за {payload['experiments']} экспериментов")
+        elif kind == CANCELLED:
+            append_run_id = None
+            progress_label.config(text=f"Отменено после {payload} экспериментов")
+        else:
+            messagebox.showerror("Ошибка", str(payload))
+        return
+
+    if latest is not None:
+        progress_var.set(latest["progress"] * 100)
+        progress_label.config(text=f"Выполнено экспериментов: {latest['experiments']}")
+        display_result(latest)
+    root.after(100, poll_worker)
+
+
+def read_model(model_name):
+    # Модель из реестра: n и p берутся из основных полей, если они нужны
+    # модели, остальные параметры — из строки вида «lam=3, p_gb=0.01»
+    values = {}
+    if entry_n.get().strip():
+        values["n"] = int(entry_n.get())
+    if entry_p.get().strip():
+        values["p"] = float(entry_p.get())
+    for item in entry_model_params.get().split(","):
+        if not item.strip():
+            continue
+        key, separator, value = item.partition("=")
+        if not separator:
+            raise ValueError(f"Параметр должен иметь вид ключ=значение: {item.strip()}")
+        try:
+            values[key.strip()] = float(value)
+        except ValueError:
+            values[key.strip()] = value.strip()
+    return create_model(model_name, **values)
 
-    except ValueError:
-        messagebox.showerror("Ошибка ввода", "Проверьте введённые значения:\n"
-                                             "Число сообщений должно быть > 0,\n"
-                                             "Вероятность искажения должна быть в пределах [0, 1],\n"
-                                             "Число экспериментов должно быть > 0.")
 
+def run_experiment():
+    if worker is not None:
+        return
+    model_name = model_var.get()
+    if model_name != "binomial":
+        try:
+            model = read_model(model_name)
+            experiments = int(entry_experiments.get())
+            if experiments <= 0:
+                raise ValueError("Число экспериментов должно быть > 0")
+        except ValueError as error:
+            messagebox.showerror("Ошибка ввода", f"Проверьте параметры модели {model_name}:\n{error}")
+            return
+        n = p = None
+    else:
+        model = None
+        try:
+            n = int(entry_n.get())
+            p = float(entry_p.get())
+            experiments = int(entry_experiments.get())
+
+            if n <= 0 or not (0 <= p <= 1) or experiments <= 0:
+                raise ValueError("Некорректные данные")
+
+        except ValueError:
+            messagebox.showerror("Ошибка ввода", "Проверьте введённые значения:\n"
+                                                 "Число сообщений должно быть > 0,\n"
+                                                 "Вероятность искажения должна быть в пределах [0, 1],\n"
+                                                 "Число экспериментов должно быть > 0.")
+            return
+
+    # В адаптивном режиме число экспериментов — верхняя граница
+    rule = StoppingRule() if adaptive_var.get() else None
+    # Исходы отдельных экспериментов хранятся только при выгрузке в файл
+    samples_path = None
+    if export_var.get():
+        if rule is not None:
+            messagebox.showerror("Ошибка ввода", "Выгрузка исходов недоступна в режиме «до сходимости»")
+            return
+        samples_path = filedialog.asksaveasfilename(title="Файл для исходов экспериментов",
+                                                    defaultextension=".npy", filetypes=[("NumPy", "*.npy")])
+        if not samples_path:
+            return
+    start_worker(n, p, experiments, rule=rule, model=model, samples_path=samples_path)
+
+
+def start_worker(n, p, experiments, seed=None, rule=None, model=None, samples_path=None):
+    # Вычисления идут в отдельном потоке, окно остаётся отзывчивым
+    global worker, worker_profiler
+    if seed is None:
+        # Случайное, но известное зерно: сохранённый прогон можно повторить
+        seed = np.random.SeedSequence().entropy
+    worker_profiler = StageProfiler(track_allocations=True)
+    worker = SimulationWorker(n, p, experiments, seed, profiler=worker_profiler, rule=rule, model=model,
+                              samples_path=samples_path)
+    progress_var.set(0)
+    progress_label.config(text="")
+    set_running(True)
+    worker.start()
+    root.after(100, poll_worker)
+
+
+def cancel_experiment():
+    if worker is not None:
+        worker.cancel()
+
+
+def save_result():
+    global last_result
+    if last_result is None:
+        messagebox.showinfo("Сохранение", "Нет результата для сохранения")
+        return
+    if "run_id" in last_result:
+        messagebox.showinfo("Сохранение", f"Результат уже сохранён как {last_result['run_id']}")
+        return
+    try:
+        run_id = run_store.save(last_result)
+    except (OSError, ValueError) as error:
+        messagebox.showerror("Ошибка", f"Не удалось сохранить прогон:\n{error}")
+        return
+    last_result = dict(last_result, run_id=run_id)
+    progress_label.config(text=f"Сохранено как {run_id}")
+
+
+def open_run_browser():
+    # Список сохранённых прогонов: открыть без моделирования, дозаписать
+    # эксперименты (их число — из поля «Число экспериментов») или удалить
+    window = tk.Toplevel(root)
+    window.title("Сохранённые прогоны")
+    runs_tree = ttk.Treeview(window, columns=('id', 'model', 'experiments', 'D', 'xn'),
+                             show='headings', height=12)
+    for column, heading, width in (('id', 'Прогон', 220), ('model', 'Модель', 320),
+                                   ('experiments', 'Экспериментов', 140), ('D', 'D', 100),
+                                   ('xn', 'x', 60)):
+        runs_tree.heading(column, text=heading)
+        runs_tree.column(column, width=width, anchor='center')
+    runs_tree.pack(fill='both', expand=True, padx=10, pady=10)
+
+    def refresh():
+        runs_tree.delete(*runs_tree.get_children())
+        for entry in run_store.runs():
+            parameters = ", ".join(f"{key}={value}" for key, value in entry["model"].items() if key != "model")
+            runs_tree.insert('', 'end', iid=entry["id"], values=(
+                entry["id"], f"{entry['model']['model']}: {parameters}", entry["experiments"],
+                f"{entry['D']:.4f}", entry["xn"]))
+
+    def selected_run():
+        selection = runs_tree.selection()
+        if not selection:
+            messagebox.showinfo("Прогоны", "Выберите прогон в списке", parent=window)
+            return None
+        return selection[0]
+
+    def open_run():
+        global last_result
+        run_id = selected_run()
+        if run_id is None:
+            return
+        try:
+            result = run_store.load(run_id)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Ошибка", str(error), parent=window)
+            return
+        last_result = result
+        display_result(result)
+        progress_label.config(text=f"Прогон {run_id}: {result['experiments']} экспериментов")
+
+    def append_run():
+        global append_run_id
+        run_id = selected_run()
+        if run_id is None or worker is not None:
+            return
+        try:
+            experiments = int(entry_experiments.get())
+            if experiments <= 0:
+                raise ValueError("Число экспериментов должно быть > 0")
+            model = RunStore.model(run_store.entry(run_id))
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Ошибка ввода", str(error), parent=window)
+            return
+        append_run_id = run_id
+        start_worker(None, None, experiments, model=model)
+
+    def delete_run():
+        run_id = selected_run()
+        if run_id is None or not messagebox.askyesno("Удаление", f"Удалить прогон {run_id}?", parent=window):
+            return
+        run_store.delete(run_id)
+        refresh()
+
+    buttons_frame = ttk.Frame(window)
+    buttons_frame.pack(pady=(0, 10))
+    for text, command in (("Открыть", open_run), ("Дозаписать", append_run),
+                          ("Удалить", delete_run), ("Обновить", refresh)):
+        ttk.Button(buttons_frame, text=text, command=command).pack(side=tk.LEFT, padx=5)
+    refresh()
+
+
+worker = None
+last_result = None
+# Прогон, к которому дозаписываются эксперименты текущего фонового потока
+append_run_id = None
+run_store = RunStore(RUN_STORE_DIRECTORY)
 
 root = tk.Tk()
 root.title("Experiment Results: Channel Distortions")
@@ -212,6 +458,23 @@ ttk.Label(param_frame, text='Число экспериментов:', font=('Hel
 entry_experiments = ttk.Entry(param_frame, font=('Helvetica', 14))
 entry_experiments.grid(row=2, column=1, padx=10, pady=5, sticky='ew')
 
+ttk.Label(param_frame, text='Модель канала:', font=('Helvetica', 14)).grid(row=3, column=0, sticky='w', pady=5)
+model_var = tk.StringVar(value="binomial")
+model_box = ttk.Combobox(param_frame, textvariable=model_var, values=sorted(MODELS), state="readonly",
+                         font=('Helvetica', 14))
+model_box.grid(row=3, column=1, padx=10, pady=5, sticky='ew')
+
+ttk.Label(param_frame, text='Параметры модели:', font=('Helvetica', 14)).grid(row=4, column=0, sticky='w', pady=5)
+entry_model_params = ttk.Entry(param_frame, font=('Helvetica', 14))
+entry_model_params.grid(row=4, column=1, padx=10, pady=5, sticky='ew')
+
+adaptive_var = tk.BooleanVar(value=False)
+ttk.Checkbutton(param_frame, text='До сходимости D (число экспериментов — максимум)',
+                variable=adaptive_var).grid(row=5, column=0, sticky='w', pady=5)
+export_var = tk.BooleanVar(value=False)
+ttk.Checkbutton(param_frame, text='Выгрузить исходы экспериментов (.npy)',
+                variable=export_var).grid(row=5, column=1, sticky='w', pady=5)
+
 param_frame.columnconfigure(1, weight=1)
 # Создаём стиль для увеличения размера текста кнопки
 style = ttk.Style()
@@ -219,7 +482,36 @@ style.configure("LargeButton.TButton", font=("Arial", 16))  # Увеличива
 
 # Кнопка с увеличенным шрифтом
 btn_run = ttk.Button(param_frame, text="Начать вычисления", command=run_experiment, style="LargeButton.TButton")
-btn_run.grid(row=3, column=0, columnspan=2, pady=10)
+btn_run.grid(row=6, column=0, columnspan=2, pady=10)
+
+# Ход вычислений и отмена
+progress_frame = ttk.Frame(param_frame)
+progress_frame.grid(row=7, column=0, columnspan=2, sticky='ew')
+progress_var = tk.DoubleVar(value=0)
+progress_bar = ttk.Progressbar(progress_frame, variable=progress_var, maximum=100)
+progress_bar.pack(side=tk.LEFT, fill='x', expand=True, padx=(0, 10))
+progress_label = ttk.Label(progress_frame, text="", font=('Helvetica', 12))
+progress_label.pack(side=tk.LEFT, padx=(0, 10))
+btn_cancel = ttk.Button(progress_frame, text="Отмена", command=cancel_experiment, state=tk.DISABLED)
+btn_cancel.pack(side=tk.RIGHT)
+
+store_frame = ttk.Frame(param_frame)
+store_frame.grid(row=8, column=0, columnspan=2, pady=(10, 0))
+ttk.Button(store_frame, text="Сохранить результат", command=save_result).pack(side=tk.LEFT, padx=5)
+ttk.Button(store_frame, text="Сохранённые прогоны", command=open_run_browser).pack(side=tk.LEFT, padx=5)
+
+# Сворачиваемая панель с замерами по этапам последнего расчёта
+btn_profile = ttk.Button(main_frame, text="Профилирование ▸", command=toggle_profile_panel)
+btn_profile.pack(anchor='w')
+profile_frame = ttk.Frame(main_frame)
+profile_tree = ttk.Treeview(profile_frame, columns=('stage', 'wall', 'cpu', 'memory', 'rate'),
+                            show='headings', height=7)
+profile_tree.heading('stage', text='Этап', anchor='w')
+profile_tree.heading('wall', text='Время, мс', anchor='w')
+profile_tree.heading('cpu', text='CPU, мс', anchor='w')
+profile_tree.heading('memory', text='Память, МиБ', anchor='w')
+profile_tree.heading('rate', text='Экспериментов/с', anchor='w')
+profile_tree.pack(fill='x')
 
 results_frame = ttk.Frame(main_frame, padding=10)
 results_frame.pack(fill='both', expand=True)
@@ -238,6 +530,7 @@ tree.column('Value', anchor='center', width=100)
 tree.column('Occurrences', anchor='center', width=150)
 tree.column('Frequency', anchor='center', width=150)
 tree.pack(fill='both', expand=True)
+values_table = PagedTable(tree, table_frame)
 
 stats_tree = ttk.Treeview(table_frame, columns=('Parameter', 'Value'), show='headings', height=8)
 stats_tree.heading('Parameter', text='Параметр', anchor='w')  # Выравнивание по левому краю
@@ -245,11 +538,26 @@ stats_tree.heading('Value', text='Значение', anchor='w')  # Выравн
 stats_tree.column('Parameter', anchor='w', width=150)  # Выравнивание значений
 stats_tree.column('Value', anchor='w', width=150)  # Выравнивание значений
 stats_tree.pack(fill='both', expand=True)
+stats_items = [stats_tree.insert('', 'end') for _ in range(8)]
 
 # Добавляем метку для отображения меры расхождения
 divergence_label = ttk.Label(results_frame, text="", font=("Arial", 14), justify="center")
 divergence_label.pack(pady=10)
 
+# График функций распределения создаётся один раз и обновляется на месте
+figure = Figure(figsize=(6, 4), dpi=100)
+ax = figure.add_subplot(111)
+theoretical_line, = ax.step([], [], label="Теоретическая Fη(x)", where="post")
+sample_line, = ax.step([], [], label="Выборочная F̂η(x)", where="post", linestyle="--")
+gap_line, = ax.plot([], [], color="red", linewidth=2, marker="_", markersize=10, label="_D")
+ax.set_xlabel("x")
+ax.set_ylabel("F(x)")
+ax.legend()
+ax.set_title("Функции распределения")
+ax.grid()
+canvas = FigureCanvasTkAgg(figure, master=plot_frame)
+canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
 root.mainloop()
 
 